@@ -1,25 +1,117 @@
+import io
+import os
+import time
+
+import pandas as pd
 import streamlit as st
 from streamlit_option_menu import option_menu
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
-
-# Fungsi untuk penggabungan data
-def preprocess_data(curah_hujan, produksi_padi):
-    data_hujan_long = pd.melt(curah_hujan, id_vars=['Bulan'], var_name='Tahun', value_name='Intensitas_Hujan')
-    data_hujan_long['Tahun'] = data_hujan_long['Tahun'].str.replace('Intensitas_', '')
-    
-    data_padi_long = pd.melt(produksi_padi, id_vars=['Bulan'], var_name='Tahun', value_name='Jumlah_Produksi_Beras')
-    data_padi_long['Tahun'] = data_padi_long['Tahun'].str.replace('Jumlah_Produksi_Beras_', '')
 
-    data_merged = pd.merge(data_hujan_long, data_padi_long, on=['Bulan', 'Tahun'])
-    bulan_mapping = {"Januari": 1, "Februari": 2, "Maret": 3, "April": 4, "Mei": 5, "Juni": 6,
-                     "Juli": 7, "Agustus": 8, "September": 9, "Oktober": 10, "November": 11, "Desember": 12}
-    data_merged['Bulan_Angka'] = data_merged['Bulan'].map(bulan_mapping)
-    return data_merged
+from padi.data import MergedCache, downsample, hash_frames, paginate, summarize, year_mismatch
+from padi.dataset import SEMUA_WILAYAH, RegionDataset
+from padi.figures import FigureCache
+from padi.forecast import forecast
+from padi.ingest import ingest_hujan, ingest_padi
+from padi.jobs import TrainingQueue
+from padi.model import ModelRegistry
+from padi.scoring import KOLOM_PREDIKSI, make_grid, score_csv, score_frame
+from padi.selection import CVCache, cross_validate_grid
+from padi.telemetry import TELEMETRY, serve_metrics
+
+# Profil rerun: span tiap tahap dicatat sejak awal skrip
+mulai_rerun = time.perf_counter()
+TELEMETRY.start_rerun()
+
+# Endpoint Prometheus /metrics (aktif bila PADI_METRICS_PORT diisi), dijalankan sekali per proses
+@st.cache_resource
+def start_metrics_server(port):
+    return serve_metrics(port)
+
+if os.environ.get('PADI_METRICS_PORT'):
+    start_metrics_server(int(os.environ['PADI_METRICS_PORT']))
+
+# Cache data gabungan dibagi ke semua sesi, dihitung sekali per upload
+@st.cache_resource
+def get_merged_cache():
+    return MergedCache(max_entries=8)
+
+# Cache gambar grafik "Eksplorasi Data" dibagi ke semua sesi dengan batas ukuran total
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache(max_bytes=int(os.environ.get('PADI_FIGURE_CACHE_BYTES', 32 * 1024 * 1024)))
+
+# Registry model dibagi ke semua sesi; model disimpan ke disk agar tidak dilatih ulang setelah restart
+# (paling banyak PADI_MODEL_CACHE_ENTRIES entri di disk)
+@st.cache_resource
+def get_model_registry():
+    return ModelRegistry(max_entries=8, cache_dir=os.environ.get('PADI_MODEL_CACHE', '.cache/models'),
+                         preprocess=get_merged_cache().get,
+                         max_disk_entries=int(os.environ.get('PADI_MODEL_CACHE_ENTRIES', 64)))
+
+# Antrean pelatihan di latar dibagi ke semua sesi: job identik hanya dilatih sekali,
+# jumlah fit bersamaan dibatasi PADI_TRAIN_WORKERS
+@st.cache_resource
+def get_training_queue():
+    return TrainingQueue(get_model_registry(), max_workers=int(os.environ.get('PADI_TRAIN_WORKERS', 1)))
+
+# Hasil cross-validation per (dataset, hyperparameter) dibagi ke semua sesi dan disimpan ke disk
+@st.cache_resource
+def get_cv_cache():
+    return CVCache(cache_dir=os.environ.get('PADI_CV_CACHE', '.cache/cv'))
+
+# Indeks (wilayah, tahun, bulan) dibangun sekali per dataset
+@st.cache_resource(max_entries=8)
+def get_dataset(data_hash, _data_merged):
+    return RegionDataset.from_merged(_data_merged)
+
+# Ringkasan (total per tahun, korelasi, rata-rata bulanan) dihitung sekali per dataset
+@st.cache_resource(max_entries=8)
+def get_ringkasan(data_hash, _data_merged):
+    return summarize(_data_merged)
+
+# Status job pelatihan diperbarui tiap detik tanpa menjalankan ulang seluruh halaman;
+# begitu job selesai seluruh skrip dijalankan ulang agar hasilnya tampil
+@st.fragment(run_every=1.0)
+def status_pelatihan(job):
+    if job.done():
+        st.rerun()
+    st.info(f"Model sedang dilatih di latar ({job.status}, {job.elapsed:.0f} detik)...")
+
+# Model diambil dari antrean pelatihan. Selama job berjalan ditampilkan statusnya beserta
+# hasil terakhir yang sudah selesai di sesi ini (bila ada). Mengembalikan (entri, terbaru).
+def ambil_model(job, kunci_terakhir):
+    if job.done() and job.exception() is None:
+        st.session_state[kunci_terakhir] = job.result()
+        return job.result(), True
+    if job.done():
+        st.error(f"Pelatihan model gagal: {job.exception()}")
+    else:
+        status_pelatihan(job)
+    terakhir = st.session_state.get(kunci_terakhir)
+    if terakhir is not None:
+        st.caption("Menampilkan hasil model terakhir yang sudah selesai dilatih.")
+    return terakhir, False
+
+# Bagian halaman "Eksplorasi Data": tabel, atau daftar (jenis grafik, sumber data grafik)
+BAGIAN_EKSPLORASI = {
+    "Data Curah Hujan": None,
+    "Data Produksi Padi": None,
+    "Data Gabungan": None,
+    "Hubungan Curah Hujan dan Produksi Padi": [('scatter', 'sampel')],
+    "Tren Bulanan Curah Hujan": [('tren_hujan', 'bulanan')],
+    "Tren Bulanan Produksi Beras": [('tren_padi', 'bulanan')],
+    "Grafik Curah Hujan dan Produksi Padi": [('hujan_padi', 'bulanan')],
+    "Pie Chart: Total Curah Hujan dan Produksi Padi per Tahun": [('pie_hujan', 'total_hujan'), ('pie_padi', 'total_padi')],
+    "Heatmap Korelasi Variabel Numerik": [('heatmap', 'corr')],
+}
+
+# Tabel besar ditampilkan per halaman agar tidak seluruh baris dikirim ke browser
+def tampilkan_tabel(frame, key, page_size=100):
+    n_halaman = max((len(frame) - 1) // page_size + 1, 1)
+    halaman = 1
+    if n_halaman > 1:
+        halaman = st.number_input(f"Halaman (dari {n_halaman}):", min_value=1, max_value=n_halaman, value=1,
+                                  key=f"halaman_{key}")
+    st.write(paginate(frame, halaman, page_size))
 
 # Navigasi Sidebar
 with st.sidebar:
@@ -31,7 +123,7 @@ with st.sidebar:
         default_index=0
     )
 
-if selected == "Upload Data":
+def halaman_upload():
     st.title("Upload Dataset")
     st.write("Unggah file dataset curah hujan dan produksi padi dalam format CSV.")
 
@@ -39,122 +131,92 @@ if selected == "Upload Data":
     uploaded_padi = st.file_uploader("Unggah dataset produksi padi:", type=["csv"])
 
     if uploaded_hujan and uploaded_padi:
-        curah_hujan = pd.read_csv(uploaded_hujan)
-        produksi_padi = pd.read_csv(uploaded_padi)
+        # Dibaca per potongan dengan skema tetap, lalu di-memory-map dari cache Feather
+        cache_dir = os.environ.get('PADI_DATA_CACHE', '.cache/uploads')
+        maks = int(os.environ.get('PADI_DATA_CACHE_ENTRIES', 64))
+        try:
+            curah_hujan = ingest_hujan(uploaded_hujan, cache_dir, max_disk_entries=maks)
+            produksi_padi = ingest_padi(uploaded_padi, cache_dir, max_disk_entries=maks)
+            # Kecocokan kolom kunci (Wilayah, Bulan) antar dataset diperiksa saat data digabung
+            sidik_data = MergedCache.fingerprint(curah_hujan, produksi_padi)
+            get_merged_cache().get(curah_hujan, produksi_padi, sidik_data)
+        except ValueError as e:
+            st.error(f"Dataset tidak valid: {e}")
+            return
         st.session_state['curah_hujan'] = curah_hujan
         st.session_state['produksi_padi'] = produksi_padi
+        # Sidik jari dan hash data dihitung sekali per upload lalu dipakai halaman lain sebagai
+        # kunci cache (data gabungan, model, grafik, cross-validation) tanpa hashing ulang
+        st.session_state['sidik_data'] = sidik_data
+        st.session_state['hash_data'] = hash_frames(curah_hujan, produksi_padi)
         st.success("Dataset berhasil diunggah!")
 
-elif selected == "Eksplorasi Data":
+        # Laporkan tahun yang tidak berpasangan karena baris tahun tersebut tidak ikut dianalisis
+        selisih = year_mismatch(curah_hujan, produksi_padi)
+        if selisih['hanya_hujan'] or selisih['hanya_padi']:
+            st.warning(f"Tahun tanpa pasangan data akan diabaikan. Hanya di data curah hujan: "
+                       f"{selisih['hanya_hujan']}; hanya di data produksi padi: {selisih['hanya_padi']}")
+
+def halaman_eksplorasi():
     st.title("Eksplorasi Data")
     if 'curah_hujan' in st.session_state and 'produksi_padi' in st.session_state:
         curah_hujan = st.session_state['curah_hujan']
         produksi_padi = st.session_state['produksi_padi']
-        data_merged = preprocess_data(curah_hujan, produksi_padi)
-
-        st.write("### Data Curah Hujan")
-        st.write(curah_hujan)
-
-        st.write("### Data Produksi Padi")
-        st.write(produksi_padi)
-
-        st.write("### Data Gabungan")
-        st.write(data_merged)
-
-        # Visualisasi Hubungan Variabel
-        st.write("### Hubungan Curah Hujan dan Produksi Padi")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.scatterplot(data=data_merged, x='Intensitas_Hujan', y='Jumlah_Produksi_Beras', hue='Tahun', ax=ax)
-        plt.title("Hubungan Curah Hujan dan Produksi Padi")
-        st.pyplot(fig)
-
-        # Line plot untuk tren bulanan curah hujan
-        st.write("### Tren Bulanan Curah Hujan")
-        fig, ax = plt.subplots(figsize=(12, 6))
-        sns.lineplot(data=data_merged, x='Bulan', y='Intensitas_Hujan', hue='Tahun', marker='o', palette='tab10', ax=ax)
-        plt.title('Tren Bulanan Curah Hujan', fontsize=14)
-        plt.xlabel('Bulan', fontsize=12)
-        plt.ylabel('Intensitas Hujan (mm³)', fontsize=12)
-        plt.legend(title='Tahun')
-        plt.grid()
-        st.pyplot(fig)
-
-        # Line plot untuk tren bulanan Produksi Beras
-        st.write("### Tren Bulanan Produksi Beras")
-        fig, ax = plt.subplots(figsize=(12, 6))
-        sns.lineplot(data=data_merged, x='Bulan', y='Jumlah_Produksi_Beras', hue='Tahun', marker='o', palette='tab10', ax=ax)
-        plt.title('Tren Bulanan Produksi Beras', fontsize=14)
-        plt.xlabel('Bulan', fontsize=12)
-        plt.ylabel('Produksi Beras (ton)', fontsize=12)
-        plt.legend(title='Tahun')
-        plt.grid()
-        st.pyplot(fig)
-
-        # Grafik Curah Hujan dan Produksi Padi
-        st.write("### Grafik Curah Hujan dan Produksi Padi")
-        fig, ax1 = plt.subplots(figsize=(12, 6))
-
-        ax2 = ax1.twinx()
-        sns.lineplot(data=data_merged, x='Bulan', y='Intensitas_Hujan', hue='Tahun', marker='o', ax=ax1, palette='Blues')
-        sns.lineplot(data=data_merged, x='Bulan', y='Jumlah_Produksi_Beras', hue='Tahun', marker='s', ax=ax2, palette='Greens')
-
-        ax1.set_title("Curah Hujan dan Produksi Padi per Bulan", fontsize=14)
-        ax1.set_xlabel('Bulan', fontsize=12)
-        ax1.set_ylabel('Intensitas Hujan (mm³)', fontsize=12, color='blue')
-        ax2.set_ylabel('Jumlah Produksi Padi (ton)', fontsize=12, color='green')
-
-        plt.grid()
-        st.pyplot(fig)
-
-        # Pie Chart untuk Total Curah Hujan dan Produksi Padi per Tahun
-        st.write("### Pie Chart: Total Curah Hujan dan Produksi Padi per Tahun")
-
-        # Total Curah Hujan per Tahun
-        total_hujan = data_merged.groupby('Tahun')['Intensitas_Hujan'].sum()
-        fig, ax = plt.subplots(figsize=(8, 6))
-        ax.pie(total_hujan, labels=total_hujan.index, autopct='%1.1f%%', colors=sns.color_palette('Blues'), startangle=90)
-        ax.set_title("Distribusi Total Curah Hujan per Tahun")
-        st.pyplot(fig)
-
-        # Total Produksi Padi per Tahun
-        total_padi = data_merged.groupby('Tahun')['Jumlah_Produksi_Beras'].sum()
-        fig, ax = plt.subplots(figsize=(8, 6))
-        ax.pie(total_padi, labels=total_padi.index, autopct='%1.1f%%', colors=sns.color_palette('Greens'), startangle=90)
-        ax.set_title("Distribusi Total Produksi Padi per Tahun")
-        st.pyplot(fig)
-
-        # Heatmap korelasi variabel numerik
-        st.write("### Heatmap Korelasi Variabel Numerik")
-        fig, ax = plt.subplots(figsize=(8, 6))
-        corr = data_merged[['Intensitas_Hujan', 'Jumlah_Produksi_Beras']].corr()
-        sns.heatmap(corr, annot=True, cmap='coolwarm', fmt='.2f', ax=ax)
-        plt.title('Heatmap Korelasi Variabel Numerik', fontsize=14)
-        st.pyplot(fig)
+        data_merged = get_merged_cache().get(curah_hujan, produksi_padi, st.session_state['sidik_data'])
+
+        data_hash = st.session_state['hash_data']
+
+        # Filter wilayah diambil dari indeks (wilayah, tahun, bulan), tanpa memindai ulang data gabungan
+        dataset = get_dataset(data_hash, data_merged)
+        if dataset.has_regions:
+            wilayah = st.selectbox("Pilih Wilayah:", [SEMUA_WILAYAH] + dataset.wilayah)
+            if wilayah != SEMUA_WILAYAH:
+                data_merged = dataset.to_frame(wilayah)
+                data_hash = f"{data_hash}/{wilayah}"
+
+        # Hanya bagian yang dipilih yang dihitung dan dikirim ke browser
+        bagian = st.multiselect("Pilih bagian yang ingin ditampilkan:", list(BAGIAN_EKSPLORASI),
+                                default=["Hubungan Curah Hujan dan Produksi Padi"])
+
+        tabel = {"Data Curah Hujan": curah_hujan, "Data Produksi Padi": produksi_padi, "Data Gabungan": data_merged}
+        figure_cache = get_figure_cache()
+        for judul in bagian:
+            st.write(f"### {judul}")
+            if judul in tabel:
+                tampilkan_tabel(tabel[judul], key=judul)
+                continue
+            # Grafik dirender sekali per dataset, selanjutnya diambil dari cache gambar
+            for chart, sumber in BAGIAN_EKSPLORASI[judul]:
+                if sumber == 'sampel':
+                    data = lambda: downsample(data_merged)
+                else:
+                    data = lambda sumber=sumber: get_ringkasan(data_hash, data_merged)[sumber]
+                st.image(figure_cache.get(data_hash, chart, data))
 
     else:
         st.warning("Harap unggah dataset terlebih dahulu di halaman 'Upload Data'.")
 
-elif selected == "Model dan Evaluasi":
+def halaman_model():
     st.title("MODEL DAN EVALUASI")
     
     if 'curah_hujan' in st.session_state and 'produksi_padi' in st.session_state:
         curah_hujan = st.session_state['curah_hujan']
         produksi_padi = st.session_state['produksi_padi']
-        data_merged = preprocess_data(curah_hujan, produksi_padi)
+        data_merged = get_merged_cache().get(curah_hujan, produksi_padi, st.session_state['sidik_data'])
+        data_hash = st.session_state['hash_data']
 
-        # Split Data
-        X = data_merged[['Intensitas_Hujan', 'Bulan_Angka']]
         y = data_merged['Jumlah_Produksi_Beras']
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        # Model Random Forest
-        model = RandomForestRegressor(random_state=42, n_estimators=100)
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
+        # Model Random Forest (dilatih sekali per dataset di antrean latar, diambil dari registry)
+        hasil, terbaru = ambil_model(get_training_queue().submit(curah_hujan, produksi_padi, mode='evaluasi',
+                                                                 data_hash=data_hash),
+                                     'evaluasi_terakhir')
+        if hasil is None:
+            return
 
         # Evaluasi Model
-        mse = mean_squared_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
+        mse = hasil['mse']
+        r2 = hasil['r2']
 
         st.write("### Deskripsi Model")
         st.write("""
@@ -181,60 +243,154 @@ elif selected == "Model dan Evaluasi":
         2. **MSE** mencatat error rata-rata pada data pengujian sebesar **{mse:.2f}** ton.
         """)
 
-        # Visualisasi Model Prediksi vs Aktual
-        st.write("### Visualisasi Prediksi vs Aktual")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.scatter(y_test, y_pred, alpha=0.7, label="Prediksi")
-        ax.plot([y.min(), y.max()], [y.min(), y.max()], '--r', linewidth=2, label="Perfect Fit")
-        plt.title("Prediksi vs Data Aktual", fontsize=14)
-        plt.xlabel("Produksi Padi Aktual (ton)", fontsize=12)
-        plt.ylabel("Produksi Padi Prediksi (ton)", fontsize=12)
-        plt.legend()
-        plt.grid()
-        st.pyplot(fig)
-
-        # Visualisasi Intensitas Hujan vs Produksi Beras
-        st.write("### Visualisasi Intensitas Hujan vs Produksi Aktual dan Prediksi")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.scatter(X_test['Intensitas_Hujan'], y_test, alpha=0.7, label="Aktual", c="blue")
-        ax.scatter(X_test['Intensitas_Hujan'], y_pred, alpha=0.7, label="Prediksi", c="orange")
-        plt.title("Intensitas Hujan vs Produksi Padi", fontsize=14)
-        plt.xlabel("Intensitas Hujan (mm³)", fontsize=12)
-        plt.ylabel("Produksi Padi (ton)", fontsize=12)
-        plt.legend()
-        plt.grid()
-        st.pyplot(fig)
+        # Grafik evaluasi dirender sekali per dataset, selanjutnya diambil dari cache gambar.
+        # Hasil model lama (job untuk dataset ini belum selesai) tidak digambar agar cache
+        # gambar dataset ini tidak terisi grafik model lain.
+        figure_cache = get_figure_cache()
+        data_grafik = lambda: {**hasil, 'y_range': (y.min(), y.max())}
+
+        if terbaru:
+            # Visualisasi Model Prediksi vs Aktual
+            st.write("### Visualisasi Prediksi vs Aktual")
+            st.image(figure_cache.get(data_hash, 'prediksi_aktual', data_grafik))
+
+            # Visualisasi Intensitas Hujan vs Produksi Beras
+            st.write("### Visualisasi Intensitas Hujan vs Produksi Aktual dan Prediksi")
+            st.image(figure_cache.get(data_hash, 'intensitas_prediksi', data_grafik))
+
+        # Seleksi model: cross-validation atas grid hyperparameter, hasil per lipatan di-cache
+        st.write("### Seleksi Model (Cross-Validation)")
+        st.write("Satu pembagian 80/20 pada data sekecil ini sangat dipengaruhi kebetulan. Bandingkan beberapa "
+                 "konfigurasi dengan k-fold acak atau validasi berurutan per tahun.")
+        col1, col2 = st.columns(2)
+        grid = {
+            'n_estimators': col1.multiselect("n_estimators:", [50, 100, 200, 500], default=[50, 100, 200]),
+            'max_depth': col2.multiselect("max_depth:", [None, 3, 5, 10, 20], default=[None, 5, 10],
+                                          format_func=lambda d: "Tanpa batas" if d is None else str(d)),
+        }
+        skema = st.radio("Skema validasi:", ["kfold", "tahun"], horizontal=True,
+                         format_func=lambda s: "K-Fold acak" if s == "kfold" else "Berurutan per tahun")
+        k = st.slider("Jumlah lipatan / tahun uji:", min_value=2, max_value=10, value=5)
+
+        if grid['n_estimators'] and grid['max_depth'] and st.button("Jalankan Cross-Validation"):
+            with st.spinner("Menjalankan cross-validation..."):
+                try:
+                    hasil_cv = cross_validate_grid(data_merged, grid, scheme=skema, k=k, n_jobs=-1,
+                                                   cache=get_cv_cache(), data_hash=data_hash)
+                except ValueError as e:
+                    st.error(str(e))
+                    return
+            st.dataframe(hasil_cv.rename(columns={
+                'mse_mean': 'MSE (rata-rata)', 'mse_std': 'MSE (std)', 'r2_mean': 'R² (rata-rata)',
+                'r2_std': 'R² (std)', 'fit_seconds': 'Total waktu fit lipatan (detik)', 'cached': 'Dari cache'}))
 
     else:
         st.warning("Harap unggah dataset terlebih dahulu di halaman 'Upload Data'.")
 
-elif selected == "Prediksi":
+def halaman_prediksi():
     st.title("Prediksi Produksi Padi")
     st.write("Masukkan nilai untuk melakukan prediksi produksi padi berdasarkan intensitas hujan dan bulan.")
 
     if 'curah_hujan' in st.session_state and 'produksi_padi' in st.session_state:
         curah_hujan = st.session_state['curah_hujan']
         produksi_padi = st.session_state['produksi_padi']
-        data_merged = preprocess_data(curah_hujan, produksi_padi)
-
-        # Model Training
-        X = data_merged[['Intensitas_Hujan', 'Bulan_Angka']]
-        y = data_merged['Jumlah_Produksi_Beras']
-        model = RandomForestRegressor(random_state=42, n_estimators=100)
-        model.fit(X, y)
-
-        # Input User
-        intensitas_hujan = st.number_input("Masukkan Intensitas Hujan (mm³):", min_value=0.0, step=1.0)
-        bulan = st.selectbox("Pilih Bulan:", list(range(1, 13)))
-
-        if st.button("Prediksi"):
-            # Prediksi
-            prediksi = model.predict([[intensitas_hujan, bulan]])
-            st.write(f"### Prediksi Produksi Padi: {prediksi[0]:.2f} ton")
+        data_hash = st.session_state['hash_data']
+
+        # Model Training (diambil dari registry, hanya dilatih di antrean latar bila dataset belum pernah dilihat).
+        # Data dengan kolom 'Wilayah' memakai satu model per wilayah yang dilatih paralel.
+        mode_model = 'per_wilayah' if 'Wilayah' in curah_hujan.columns else 'penuh'
+        hasil, _ = ambil_model(get_training_queue().submit(curah_hujan, produksi_padi, mode=mode_model,
+                                                           data_hash=data_hash),
+                               'prediksi_terakhir')
+        if hasil is None:
+            return
+        model = hasil.get('models', hasil.get('model'))
+        per_wilayah = isinstance(model, dict)
+
+        mode = st.radio("Mode prediksi:", ["Tunggal", "Batch (CSV skenario)", "Grid skenario", "Prakiraan"],
+                        horizontal=True)
+
+        if mode == "Tunggal":
+            # Input User
+            intensitas_hujan = st.number_input("Masukkan Intensitas Hujan (mm³):", min_value=0.0, step=1.0)
+            bulan = st.selectbox("Pilih Bulan:", list(range(1, 13)))
+            skenario = make_grid(intensitas_hujan, intensitas_hujan, 1.0, [bulan])
+            if per_wilayah:
+                skenario['Wilayah'] = st.selectbox("Pilih Wilayah:", list(model))
+
+            if st.button("Prediksi"):
+                # Prediksi
+                prediksi = score_frame(model, skenario)
+                st.write(f"### Prediksi Produksi Padi: {prediksi[KOLOM_PREDIKSI].iloc[0]:.2f} ton")
+
+        elif mode == "Batch (CSV skenario)":
+            st.write("CSV skenario berisi kolom `Intensitas_Hujan` dan `Bulan` (nama) atau `Bulan_Angka` (1-12); "
+                     "kolom lain ikut disalin ke hasil." + (" Kolom `Wilayah` wajib diisi karena model dilatih per wilayah."
+                                                            if per_wilayah else ""))
+            uploaded_skenario = st.file_uploader("Unggah CSV skenario:", type=["csv"])
+            if uploaded_skenario and st.button("Prediksi Batch"):
+                hasil = io.StringIO()
+                try:
+                    st.session_state['hasil_prediksi'] = (score_csv(model, uploaded_skenario, hasil),
+                                                          hasil.getvalue().encode())
+                except ValueError as e:
+                    st.error(f"Skenario tidak valid: {e}")
+
+        elif mode == "Prakiraan":
+            # Model prakiraan memakai lag 1-4 bulan dan jumlah hujan 3/6 bulan terakhir;
+            # fitur lag di-cache dan hanya diperpanjang saat data bulan/tahun baru diunggah
+            st.write("Prakiraan produksi beberapa bulan setelah bulan terakhir pada data, "
+                     "berdasarkan curah hujan bulan-bulan sebelumnya.")
+            horizon = st.slider("Jumlah bulan ke depan:", 1, 6, 3)
+            if st.button("Buat Prakiraan"):
+                st.session_state['job_prakiraan'] = get_training_queue().submit(
+                    curah_hujan, produksi_padi, {'horizon': horizon}, mode='forecast', data_hash=data_hash)
+            # Prakiraan hanya ditampilkan bila job-nya milik dataset dan horizon saat ini
+            job = st.session_state.get('job_prakiraan')
+            if job is not None and job.key == get_model_registry().key_for(curah_hujan, produksi_padi,
+                                                                           {'horizon': horizon}, 'forecast',
+                                                                           data_hash):
+                if not job.done():
+                    status_pelatihan(job)
+                elif job.exception() is not None:
+                    st.error(f"Prakiraan tidak dapat dibuat: {job.exception()}")
+                else:
+                    prakiraan = forecast(job.result(), get_merged_cache().get(curah_hujan, produksi_padi,
+                                                                              st.session_state['sidik_data']))
+                    st.dataframe(prakiraan)
+                    if per_wilayah:
+                        st.line_chart(prakiraan, x='Horizon', y=KOLOM_PREDIKSI, color='Wilayah')
+                    else:
+                        st.line_chart(prakiraan, x='Horizon', y=KOLOM_PREDIKSI)
+
+        else:
+            col1, col2, col3 = st.columns(3)
+            intensitas_min = col1.number_input("Intensitas minimum (mm³):", min_value=0.0, value=0.0, step=10.0)
+            intensitas_max = col2.number_input("Intensitas maksimum (mm³):", min_value=0.0, value=500.0, step=10.0)
+            langkah = col3.number_input("Langkah (mm³):", min_value=0.1, value=10.0, step=1.0)
+            wilayah_grid = st.multiselect("Wilayah:", list(model), default=list(model)) if per_wilayah else []
+            if st.button("Prediksi Grid") and (wilayah_grid or not per_wilayah):
+                mulai = time.perf_counter()
+                skenario = make_grid(intensitas_min, intensitas_max, langkah)
+                if per_wilayah:
+                    skenario = pd.concat([skenario.assign(Wilayah=w) for w in wilayah_grid], ignore_index=True)
+                hasil = score_frame(model, skenario)
+                detik = time.perf_counter() - mulai
+                st.session_state['hasil_prediksi'] = (
+                    {'rows': len(hasil), 'seconds': detik, 'rows_per_s': len(hasil) / detik if detik > 0 else float('inf')},
+                    hasil.to_csv(index=False).encode())
+
+        # Hasil batch/grid disimpan di session agar tetap ada setelah tombol unduh ditekan
+        if mode in ("Batch (CSV skenario)", "Grid skenario") and 'hasil_prediksi' in st.session_state:
+            statistik, data_csv = st.session_state['hasil_prediksi']
+            st.write(f"**{statistik['rows']:,}** baris diprediksi dalam **{statistik['seconds']:.2f}** detik "
+                     f"(**{statistik['rows_per_s']:,.0f}** baris/detik).")
+            st.download_button("Unduh hasil prediksi (CSV)", data_csv, file_name="prediksi_produksi_padi.csv",
+                               mime="text/csv")
     else:
         st.warning("Harap unggah dataset terlebih dahulu di halaman 'Upload Data'.")
 
-elif selected == "About":
+def halaman_about():
     st.title("About")
     st.write("""
     **Aplikasi Prediksi Produksi Padi** ini dibuat oleh :
@@ -387,5 +543,28 @@ elif selected == "About":
     else:
         st.warning("Harap unggah dataset terlebih dahulu di halaman 'Upload Data'.")
 
-
-    
\ No newline at end of file
+# Halaman yang ditampilkan per pilihan navigasi. Tiap halaman boleh berhenti lebih awal dengan return
+# (mis. saat model masih dilatih); profil rerun dan panel debug di bawah tetap dijalankan.
+HALAMAN = {
+    "Upload Data": halaman_upload,
+    "Eksplorasi Data": halaman_eksplorasi,
+    "Model dan Evaluasi": halaman_model,
+    "Prediksi": halaman_prediksi,
+    "About": halaman_about,
+}
+
+try:
+    HALAMAN[selected]()
+finally:
+    # Panel debug (aktif dengan ?debug=1 atau PADI_DEBUG=1): span rerun ini, cache hit/miss dan memori.
+    # Dijalankan di finally agar rerun yang berhenti lebih awal (mis. saat model masih dilatih) ikut tercatat.
+    TELEMETRY.record('rerun', time.perf_counter() - mulai_rerun, page=selected)
+    rekaman_rerun = TELEMETRY.finish_rerun()
+    if st.query_params.get('debug') == '1' or os.environ.get('PADI_DEBUG'):
+        with st.sidebar.expander("Debug: profil rerun", expanded=True):
+            st.write("**Span rerun ini**")
+            st.dataframe(pd.DataFrame(rekaman_rerun), hide_index=True)
+            snapshot = TELEMETRY.snapshot()
+            st.write("**Cache hit/miss (seluruh proses)**")
+            st.dataframe(pd.DataFrame(snapshot['counters']), hide_index=True)
+            st.write(f"**Puncak RSS proses:** {TELEMETRY.peak_rss() / 1e6:.1f} MB")
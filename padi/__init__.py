@@ -0,0 +1,31 @@
+# Paket pipeline analisis pengaruh intensitas hujan terhadap produksi beras.
+# Modul di sini tidak bergantung pada Streamlit sehingga dapat dipakai ulang oleh main.py
+# maupun dijalankan tanpa UI lewat `python -m padi`. Submodul (dan scikit-learn/matplotlib
+# di dalamnya) baru diimpor saat atributnya dipakai.
+import importlib
+
+_EXPORTS = {
+    'preprocess_data': 'padi.data',
+    'reshape_wide': 'padi.data',
+    'year_mismatch': 'padi.data',
+    'MergedCache': 'padi.data',
+    'ingest_hujan': 'padi.ingest',
+    'ingest_padi': 'padi.ingest',
+    'ModelRegistry': 'padi.model',
+    'TrainingQueue': 'padi.jobs',
+    'CompactForest': 'padi.artifact',
+    'pack_forest': 'padi.artifact',
+    'score_frame': 'padi.scoring',
+    'score_csv': 'padi.scoring',
+    'make_grid': 'padi.scoring',
+    'cross_validate_grid': 'padi.selection',
+    'forecast': 'padi.forecast',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'padi' has no attribute '{name}'")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -0,0 +1,3 @@
+from padi.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+ARRAYS = ('children_left', 'children_right', 'feature', 'threshold', 'value', 'roots')
+
+
+# Ambang float32 dibulatkan ke bawah: untuk x float32 (scikit-learn juga mengubah X ke
+# float32), x <= t64 setara dengan x <= float32 terbesar yang <= t64, jadi hasil
+# percabangan sama persis dengan pohon aslinya
+def _threshold_float32(threshold):
+    t32 = threshold.astype('float32')
+    lebih = t32.astype('float64') > threshold
+    t32[lebih] = np.nextafter(t32[lebih], np.float32(-np.inf))
+    return t32
+
+
+# Semua pohon RandomForestRegressor digabung ke satu set array simpul; indeks anak
+# digeser sesuai offset pohon, daun ditandai children_left == -1
+def pack_forest(model):
+    bagian = {nama: [] for nama in ARRAYS if nama != 'roots'}
+    roots = []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        daun = tree.children_left == -1
+        roots.append(offset)
+        bagian['children_left'].append(np.where(daun, -1, tree.children_left + offset))
+        bagian['children_right'].append(np.where(daun, -1, tree.children_right + offset))
+        bagian['feature'].append(np.where(daun, 0, tree.feature))
+        bagian['threshold'].append(_threshold_float32(tree.threshold))
+        bagian['value'].append(tree.value[:, 0, 0])
+        offset += tree.node_count
+
+    arrays = {
+        'children_left': np.concatenate(bagian['children_left']).astype('int32'),
+        'children_right': np.concatenate(bagian['children_right']).astype('int32'),
+        'feature': np.concatenate(bagian['feature']).astype('int32'),
+        'threshold': np.concatenate(bagian['threshold']),
+        'value': np.concatenate(bagian['value']).astype('float64'),
+        'roots': np.asarray(roots, dtype='int32'),
+    }
+    feature_names = getattr(model, 'feature_names_in_', None)
+    meta = {
+        'n_features': int(model.n_features_in_),
+        'feature_names': None if feature_names is None else [str(f) for f in feature_names],
+        'max_depth': int(max(e.tree_.max_depth for e in model.estimators_)),
+    }
+    return CompactForest(arrays, meta)
+
+
+# Hutan pohon regresi dalam bentuk array NumPy, tanpa scikit-learn. Disimpan sebagai
+# satu berkas .npy per array sehingga bisa di-memory-map dan dibagi antarproses.
+class CompactForest:
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+
+    @property
+    def n_estimators(self):
+        return len(self.arrays['roots'])
+
+    # Ditulis ke direktori sementara unik lalu dipindah ke path, sehingga pembaca tidak
+    # pernah melihat array yang setengah tertulis
+    def save(self, path):
+        tmp = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        for nama in ARRAYS:
+            np.save(os.path.join(tmp, f"{nama}.npy"), self.arrays[nama])
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(self.meta, f)
+        if os.path.exists(path):
+            lama = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+            os.replace(path, os.path.join(lama, 'forest'))
+            os.replace(tmp, path)
+            shutil.rmtree(lama, ignore_errors=True)
+        else:
+            os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        arrays = {nama: np.load(os.path.join(path, f"{nama}.npy"), mmap_mode=mmap_mode) for nama in ARRAYS}
+        with open(os.path.join(path, 'meta.json')) as f:
+            return cls(arrays, json.load(f))
+
+    def _as_array(self, X):
+        nama = self.meta['feature_names']
+        if nama is not None and hasattr(X, 'columns'):
+            X = X[nama]
+        X = np.asarray(X, dtype='float32')
+        if X.ndim != 2 or X.shape[1] != self.meta['n_features']:
+            raise ValueError(f"X harus berbentuk (n, {self.meta['n_features']}), diterima {X.shape}")
+        return X
+
+    # Penelusuran semua pohon sekaligus per potongan baris: tiap langkah menurunkan
+    # simpul (baris x pohon) satu tingkat. Prediksi pohon dijumlahkan berurutan lalu
+    # dibagi jumlah pohon, sama seperti RandomForestRegressor.predict.
+    def predict(self, X, chunk_size=8192):
+        X = self._as_array(X)
+        a = self.arrays
+        kiri, kanan, fitur, ambang, nilai = (a['children_left'], a['children_right'], a['feature'],
+                                             a['threshold'], a['value'])
+        hasil = np.empty(len(X), dtype='float64')
+        for mulai in range(0, len(X), chunk_size):
+            x = X[mulai:mulai + chunk_size]
+            simpul = np.broadcast_to(a['roots'], (len(x), self.n_estimators)).copy()
+            baris = np.arange(len(x))[:, None]
+            for _ in range(self.meta['max_depth']):
+                anak_kiri = kiri[simpul]
+                cabang = anak_kiri != -1
+                if not cabang.any():
+                    break
+                ke_kiri = x[baris, fitur[simpul]] <= ambang[simpul]
+                simpul = np.where(cabang, np.where(ke_kiri, anak_kiri, kanan[simpul]), simpul)
+            daun = nilai[simpul]
+            total = np.zeros(len(x), dtype='float64')
+            for j in range(self.n_estimators):
+                total += daun[:, j]
+            hasil[mulai:mulai + chunk_size] = total / self.n_estimators
+        return hasil
+
+
+def _is_forest(obj):
+    return hasattr(obj, 'estimators_') and hasattr(obj, 'n_features_in_')
+
+
+# Entri registry (dict berisi model tunggal 'model' atau dict model 'models') diubah
+# menjadi kerangka tanpa objek scikit-learn; tiap model ditulis ke subdirektori path
+# dan kerangka hanya menyimpan nama subdirektorinya
+def save_entry(entry, path):
+    os.makedirs(path, exist_ok=True)
+    kerangka = {}
+    for kunci, isi in entry.items():
+        if _is_forest(isi):
+            pack_forest(isi).save(os.path.join(path, kunci))
+            kerangka[kunci] = {'__forest__': kunci}
+        elif isinstance(isi, dict) and isi and all(_is_forest(m) for m in isi.values()):
+            kerangka[kunci] = {}
+            for i, (k, m) in enumerate(isi.items()):
+                pack_forest(m).save(os.path.join(path, f"{kunci}_{i}"))
+                kerangka[kunci][k] = {'__forest__': f"{kunci}_{i}"}
+        else:
+            kerangka[kunci] = isi
+    return kerangka
+
+
+def _is_ref(obj):
+    return isinstance(obj, dict) and set(obj) == {'__forest__'}
+
+
+def load_entry(kerangka, path, mmap_mode='r'):
+    entry = {}
+    for kunci, isi in kerangka.items():
+        if _is_ref(isi):
+            isi = CompactForest.load(os.path.join(path, isi['__forest__']), mmap_mode)
+        elif isinstance(isi, dict) and isi and all(_is_ref(v) for v in isi.values()):
+            isi = {k: CompactForest.load(os.path.join(path, v['__forest__']), mmap_mode) for k, v in isi.items()}
+        entry[kunci] = isi
+    return entry
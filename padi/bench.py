@@ -0,0 +1,179 @@
+import io
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from padi.data import BULAN_MAPPING, PREFIX_HUJAN, PREFIX_PADI, preprocess_data, reshape_wide
+from padi.dataset import RegionDataset
+
+BULAN = list(BULAN_MAPPING)
+STAGES = ['ingest', 'preprocess', 'index', 'fit', 'predict_single', 'predict_batch']
+
+
+# Data sintetis berbentuk tabel lebar BPS dengan total n_rows baris setelah digabung.
+# unique_bulan=True memberi label bulan unik per baris (agar pd.merge di preprocess_data
+# tidak menghasilkan perkalian baris); False mengulang nama bulan asli (Januari..Desember)
+# untuk beberapa wilayah yang ditumpuk dalam satu file, dibedakan oleh kolom 'Wilayah'.
+def make_wide(n_rows, n_tahun=10, seed=0, unique_bulan=True):
+    rng = np.random.default_rng(seed)
+    n_baris = max(n_rows // n_tahun, 1)
+    if unique_bulan:
+        kolom = {'Bulan': [BULAN[i % 12] if i < 12 else f"{BULAN[i % 12]} #{i // 12}" for i in range(n_baris)]}
+    else:
+        kolom = {'Wilayah': [f"Wilayah {i // 12}" for i in range(n_baris)],
+                 'Bulan': [BULAN[i % 12] for i in range(n_baris)]}
+    tahun = [str(2000 + i) for i in range(n_tahun)]
+    curah_hujan = pd.DataFrame(kolom)
+    produksi_padi = pd.DataFrame(kolom)
+    for t in tahun:
+        curah_hujan[PREFIX_HUJAN + t] = rng.uniform(0, 500, n_baris)
+        produksi_padi[PREFIX_PADI + t] = rng.uniform(1000, 60000, n_baris)
+    return curah_hujan, produksi_padi
+
+
+# Median beberapa pengulangan (setelah satu putaran pemanasan) agar satu putaran yang
+# terganggu proses lain tidak menggeser hasil
+def _waktu(fungsi, args, repeat):
+    if repeat > 1:
+        fungsi(*args)
+    hasil = []
+    for _ in range(repeat):
+        mulai = time.perf_counter()
+        fungsi(*args)
+        hasil.append(time.perf_counter() - mulai)
+    return float(np.median(hasil))
+
+
+# Puncak alokasi selama fungsi berjalan (tracemalloc: alokasi Python dan NumPy;
+# alokasi internal C di luar NumPy, mis. struktur pohon scikit-learn, tidak terhitung)
+def _puncak_memori(fungsi, args):
+    tracemalloc.start()
+    try:
+        fungsi(*args)
+        _, puncak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return puncak
+
+
+# Bandingkan preprocess_data (melt + merge) dengan reshape_wide (NumPy) per ukuran data
+def bench_reshape(sizes=(1_000, 100_000, 10_000_000), repeat=3):
+    laporan = []
+    for size in sizes:
+        args = make_wide(size)
+        baris = {'rows': size}
+        for nama, fungsi in [('preprocess_data', preprocess_data),
+                             ('reshape_wide', reshape_wide),
+                             ('reshape_wide_typed', lambda h, p: reshape_wide(h, p, typed=True))]:
+            baris[f'{nama}_s'] = _waktu(fungsi, args, repeat)
+            baris[f'{nama}_peak_mb'] = _puncak_memori(fungsi, args) / 1e6
+        baris['speedup'] = baris['preprocess_data_s'] / baris['reshape_wide_s']
+        baris['speedup_typed'] = baris['preprocess_data_s'] / baris['reshape_wide_typed_s']
+        laporan.append(baris)
+    return pd.DataFrame(laporan)
+
+
+def _ingest(csv_hujan, csv_padi):
+    from padi.ingest import ingest_upload
+
+    return ingest_upload(io.BytesIO(csv_hujan), PREFIX_HUJAN), ingest_upload(io.BytesIO(csv_padi), PREFIX_PADI)
+
+
+def _fit(data_merged, n_estimators):
+    from padi.model import train_penuh
+
+    return train_penuh(data_merged, {'n_estimators': n_estimators, 'random_state': 42})['model']
+
+
+# Ukur tiap tahap pipeline (ingest CSV, penggabungan, indeks wilayah, fit, prediksi tunggal dan batch)
+# untuk setiap ukuran data. Fit hanya dijalankan sampai fit_max_rows baris; prediksi
+# memakai model yang dilatih dengan min(rows, fit_max_rows) baris; predict_single selalu
+# memprediksi satu baris (rows = ukuran dataset model tersebut).
+def bench_pipeline(sizes=(96, 10_000, 1_000_000), repeat=5, n_estimators=100, fit_max_rows=100_000):
+    from padi.scoring import make_grid, score_frame
+
+    hasil = []
+
+    def catat(stage, rows, fungsi, args, n_repeat=repeat):
+        hasil.append({
+            'stage': stage,
+            'rows': rows,
+            'seconds': _waktu(fungsi, args, n_repeat),
+            'peak_mb': _puncak_memori(fungsi, args) / 1e6,
+        })
+
+    for size in sizes:
+        curah_hujan, produksi_padi = make_wide(size, n_tahun=min(10, max(size // 12, 1)), unique_bulan=False)
+        csv_hujan = curah_hujan.to_csv(index=False).encode()
+        csv_padi = produksi_padi.to_csv(index=False).encode()
+        catat('ingest', size, _ingest, (csv_hujan, csv_padi))
+
+        curah_hujan, produksi_padi = _ingest(csv_hujan, csv_padi)
+        catat('preprocess', size, lambda h, p: reshape_wide(h, p, typed=True), (curah_hujan, produksi_padi))
+        data_merged = reshape_wide(curah_hujan, produksi_padi, typed=True)
+        catat('index', size, RegionDataset.from_merged, (data_merged,))
+
+        data_fit = data_merged.iloc[:fit_max_rows]
+        if size <= fit_max_rows:
+            catat('fit', size, _fit, (data_fit, n_estimators), n_repeat=1)
+        model = _fit(data_fit, n_estimators)
+
+        satu = make_grid(250.0, 250.0, 1.0, [6])
+        catat('predict_single', size, score_frame, (model, satu))
+        catat('predict_batch', size, score_frame, (model, data_merged[['Intensitas_Hujan', 'Bulan_Angka']]))
+    return hasil
+
+
+def _meta():
+    import sklearn
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+# Laporan JSON yang bisa dibandingkan antar versi (lihat compare_reports)
+def run_suite(sizes=(96, 10_000, 1_000_000), repeat=5, n_estimators=100, fit_max_rows=100_000):
+    return {
+        'meta': dict(_meta(), sizes=list(sizes), repeat=repeat, n_estimators=n_estimators,
+                     fit_max_rows=fit_max_rows),
+        'results': bench_pipeline(sizes, repeat, n_estimators, fit_max_rows),
+    }
+
+
+# Daftar (stage, rows) yang waktu atau memorinya naik lebih dari tolerance dibanding baseline.
+# Kenaikan absolut di bawah min_seconds / min_mb diabaikan: tahap yang sangat singkat
+# berfluktuasi puluhan persen antar putaran meskipun kodenya sama.
+def compare_reports(baseline, current, tolerance=0.2, min_seconds=0.01, min_mb=1.0):
+    ambang = {'seconds': min_seconds, 'peak_mb': min_mb}
+    lama = {(r['stage'], r['rows']): r for r in baseline['results']}
+    regresi = []
+    for r in current['results']:
+        b = lama.get((r['stage'], r['rows']))
+        if b is None:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            if b[metric] > 0 and r[metric] / b[metric] > 1 + tolerance and r[metric] - b[metric] > ambang[metric]:
+                regresi.append({'stage': r['stage'], 'rows': r['rows'], 'metric': metric,
+                                'baseline': b[metric], 'current': r[metric], 'ratio': r[metric] / b[metric]})
+    return regresi
+
+
+def save_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,212 @@
+# CLI pipeline tanpa Streamlit: python -m padi {ingest,train,evaluate,predict,forecast,bench} ...
+# Modul berat (pandas, scikit-learn, matplotlib) diimpor di dalam tiap perintah agar
+# `python -m padi --help` dan perintah ringan cepat dimulai.
+import argparse
+import json
+import os
+import sys
+
+
+def _load_inputs(args):
+    from padi.ingest import ingest_hujan, ingest_padi
+
+    with open(args.hujan, 'rb') as f_hujan, open(args.padi, 'rb') as f_padi:
+        return ingest_hujan(f_hujan, args.data_cache), ingest_padi(f_padi, args.data_cache)
+
+
+def _registry(args):
+    from padi.model import ModelRegistry
+
+    return ModelRegistry(cache_dir=args.model_cache)
+
+
+def _params(args):
+    params = {'n_estimators': args.n_estimators}
+    if args.max_depth is not None:
+        params['max_depth'] = args.max_depth
+    return params
+
+
+# Data dengan kolom 'Wilayah' memakai satu model per wilayah
+def _mode_prediksi(curah_hujan):
+    return 'per_wilayah' if 'Wilayah' in curah_hujan.columns else 'penuh'
+
+
+def _print(obj):
+    print(json.dumps(obj, indent=2, default=str))
+
+
+def cmd_ingest(args):
+    from padi.data import year_mismatch
+
+    curah_hujan, produksi_padi = _load_inputs(args)
+    _print({
+        'curah_hujan': {'rows': len(curah_hujan), 'columns': len(curah_hujan.columns)},
+        'produksi_padi': {'rows': len(produksi_padi), 'columns': len(produksi_padi.columns)},
+        'year_mismatch': year_mismatch(curah_hujan, produksi_padi),
+    })
+
+
+def cmd_train(args):
+    curah_hujan, produksi_padi = _load_inputs(args)
+    registry = _registry(args)
+    hasil = registry.get_or_train(curah_hujan, produksi_padi, _params(args), mode='evaluasi')
+    registry.get_or_train(curah_hujan, produksi_padi, _params(args), mode=_mode_prediksi(curah_hujan))
+    _print({'holdout': {'mse': hasil['mse'], 'r2': hasil['r2']}, 'model_cache': args.model_cache})
+
+
+def cmd_evaluate(args):
+    curah_hujan, produksi_padi = _load_inputs(args)
+    hasil = _registry(args).get_or_train(curah_hujan, produksi_padi, _params(args), mode='evaluasi')
+    _print({'holdout': {'mse': hasil['mse'], 'r2': hasil['r2']}})
+    if not args.cv:
+        return
+
+    from padi.data import hash_frames
+    from padi.model import preprocess_typed
+    from padi.selection import CVCache, cross_validate_grid
+
+    # Kunci cache sama dengan kunci yang dipakai aplikasi Streamlit (hash data upload)
+    data_merged = preprocess_typed(curah_hujan, produksi_padi)
+    grid = {'n_estimators': args.grid_n_estimators, 'max_depth': args.grid_max_depth}
+    tabel = cross_validate_grid(data_merged, grid, scheme=args.scheme, k=args.k, n_jobs=args.n_jobs,
+                                cache=CVCache(args.cv_cache), data_hash=hash_frames(curah_hujan, produksi_padi))
+    print(tabel.to_string(index=False))
+
+
+def cmd_predict(args):
+    from padi.scoring import make_grid, score_csv, score_frame
+
+    curah_hujan, produksi_padi = _load_inputs(args)
+    hasil = _registry(args).get_or_train(curah_hujan, produksi_padi, _params(args), mode=_mode_prediksi(curah_hujan))
+    model = hasil.get('models', hasil.get('model'))
+    if args.scenario:
+        statistik = score_csv(model, args.scenario, args.output or sys.stdout, chunk_size=args.chunk_size)
+        print(json.dumps(statistik), file=sys.stderr)
+    else:
+        if args.intensitas is None or args.bulan is None:
+            raise SystemExit("predict membutuhkan --scenario atau --intensitas dan --bulan")
+        skenario = make_grid(args.intensitas, args.intensitas, 1.0, [args.bulan])
+        if isinstance(model, dict):
+            if args.wilayah is None:
+                raise SystemExit(f"predict membutuhkan --wilayah (salah satu dari: {', '.join(model)})")
+            skenario['Wilayah'] = args.wilayah
+        hasil = score_frame(model, skenario)
+        print(hasil.to_csv(index=False), end='')
+
+
+def cmd_forecast(args):
+    from padi.forecast import forecast
+    from padi.model import preprocess_typed
+
+    curah_hujan, produksi_padi = _load_inputs(args)
+    params = dict(_params(args), horizon=args.horizon)
+    entry = _registry(args).get_or_train(curah_hujan, produksi_padi, params, mode='forecast')
+    hasil = forecast(entry, preprocess_typed(curah_hujan, produksi_padi))
+    print(hasil.to_csv(index=False), end='')
+
+
+def cmd_bench(args):
+    if args.suite == 'reshape':
+        from padi.bench import bench_reshape
+
+        print(bench_reshape(args.sizes or [1_000, 100_000, 10_000_000], args.repeat).to_string(index=False))
+        return 0
+
+    import pandas as pd
+
+    from padi.bench import compare_reports, load_report, run_suite, save_report
+
+    report = run_suite(args.sizes or [96, 10_000, 1_000_000], args.repeat, args.n_estimators, args.fit_max_rows)
+    print(pd.DataFrame(report['results']).to_string(index=False))
+    if args.output:
+        save_report(report, args.output)
+    if args.compare:
+        regresi = compare_reports(load_report(args.compare), report, args.tolerance,
+                                  args.min_delta_ms / 1000, args.min_delta_mb)
+        for r in regresi:
+            print(f"REGRESI {r['stage']} rows={r['rows']} {r['metric']}: "
+                  f"{r['baseline']:.4g} -> {r['current']:.4g} ({r['ratio']:.2f}x)", file=sys.stderr)
+        return 1 if regresi else 0
+    return 0
+
+
+def _max_depth(value):
+    return None if value.lower() in ('none', '0') else int(value)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m padi',
+                                     description="Pipeline prediksi produksi padi dari intensitas hujan")
+    parser.add_argument('--metrics-file', help="tulis metrik format Prometheus (span, cache) setelah perintah selesai")
+    parser.add_argument('--log-spans', action='store_true', help="log JSON tiap span ke stderr")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    data = argparse.ArgumentParser(add_help=False)
+    data.add_argument('hujan', help="CSV curah hujan (Bulan, Intensitas_<tahun>...)")
+    data.add_argument('padi', help="CSV produksi padi (Bulan, Jumlah_Produksi_Beras_<tahun>...)")
+    data.add_argument('--data-cache', default=os.environ.get('PADI_DATA_CACHE', '.cache/uploads'))
+
+    model = argparse.ArgumentParser(add_help=False)
+    model.add_argument('--model-cache', default=os.environ.get('PADI_MODEL_CACHE', '.cache/models'))
+    model.add_argument('--n-estimators', type=int, default=100)
+    model.add_argument('--max-depth', type=_max_depth, default=None)
+
+    p = sub.add_parser('ingest', parents=[data], help="validasi CSV dan tulis cache Feather")
+    p.set_defaults(func=cmd_ingest)
+
+    for nama, func, bantuan in [('train', cmd_train, "latih model (evaluasi dan penuh) ke registry"),
+                                ('evaluate', cmd_evaluate, "metrik holdout 80/20, opsional cross-validation")]:
+        p = sub.add_parser(nama, parents=[data, model], help=bantuan)
+        p.set_defaults(func=func)
+    p.add_argument('--cv', action='store_true', help="jalankan cross-validation atas grid hyperparameter")
+    p.add_argument('--scheme', choices=['kfold', 'tahun'], default='kfold')
+    p.add_argument('--k', type=int, default=5)
+    p.add_argument('--n-jobs', type=int, default=-1)
+    p.add_argument('--grid-n-estimators', type=int, nargs='+', default=[50, 100, 200])
+    p.add_argument('--grid-max-depth', type=_max_depth, nargs='+', default=[None, 5, 10])
+    p.add_argument('--cv-cache', default=os.environ.get('PADI_CV_CACHE', '.cache/cv'))
+
+    p = sub.add_parser('predict', parents=[data, model], help="prediksi tunggal atau skor CSV skenario")
+    p.add_argument('--scenario', help="CSV skenario (Intensitas_Hujan, Bulan/Bulan_Angka)")
+    p.add_argument('--output', help="CSV hasil (default: stdout)")
+    p.add_argument('--chunk-size', type=int, default=100_000)
+    p.add_argument('--intensitas', type=float)
+    p.add_argument('--bulan', type=int, choices=range(1, 13))
+    p.add_argument('--wilayah', help="wilayah untuk prediksi tunggal bila data memiliki kolom Wilayah")
+    p.set_defaults(func=cmd_predict)
+
+    p = sub.add_parser('forecast', parents=[data, model], help="prakiraan produksi beberapa bulan ke depan")
+    p.add_argument('--horizon', type=int, default=3, help="jumlah bulan setelah bulan terakhir pada data")
+    p.set_defaults(func=cmd_forecast)
+
+    p = sub.add_parser('bench', help="benchmark tahap pipeline (laporan JSON) atau penggabungan data")
+    p.add_argument('--suite', choices=['pipeline', 'reshape'], default='pipeline')
+    p.add_argument('--sizes', type=int, nargs='+', help="jumlah baris data gabungan per ukuran")
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--n-estimators', type=int, default=100)
+    p.add_argument('--fit-max-rows', type=int, default=100_000)
+    p.add_argument('--output', help="simpan laporan JSON")
+    p.add_argument('--compare', help="laporan JSON baseline; keluar dengan kode 1 bila ada regresi")
+    p.add_argument('--tolerance', type=float, default=0.2, help="kenaikan relatif yang masih diterima")
+    p.add_argument('--min-delta-ms', type=float, default=10.0, help="kenaikan waktu absolut yang diabaikan")
+    p.add_argument('--min-delta-mb', type=float, default=1.0, help="kenaikan memori absolut yang diabaikan")
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.log_spans:
+        import logging
+
+        logging.basicConfig(format='%(message)s')
+        logging.getLogger('padi.telemetry').setLevel(logging.INFO)
+    try:
+        return args.func(args) or 0
+    finally:
+        if args.metrics_file:
+            from padi.telemetry import TELEMETRY
+
+            with open(args.metrics_file, 'w') as f:
+                f.write(TELEMETRY.prometheus_text())
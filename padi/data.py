@@ -0,0 +1,255 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from padi.telemetry import TELEMETRY
+
+BULAN_MAPPING = {"Januari": 1, "Februari": 2, "Maret": 3, "April": 4, "Mei": 5, "Juni": 6,
+                 "Juli": 7, "Agustus": 8, "September": 9, "Oktober": 10, "November": 11, "Desember": 12}
+
+
+# Fungsi untuk penggabungan data
+def preprocess_data(curah_hujan, produksi_padi):
+    data_hujan_long = pd.melt(curah_hujan, id_vars=['Bulan'], var_name='Tahun', value_name='Intensitas_Hujan')
+    data_hujan_long['Tahun'] = data_hujan_long['Tahun'].str.replace('Intensitas_', '')
+
+    data_padi_long = pd.melt(produksi_padi, id_vars=['Bulan'], var_name='Tahun', value_name='Jumlah_Produksi_Beras')
+    data_padi_long['Tahun'] = data_padi_long['Tahun'].str.replace('Jumlah_Produksi_Beras_', '')
+
+    data_merged = pd.merge(data_hujan_long, data_padi_long, on=['Bulan', 'Tahun'])
+    data_merged['Bulan_Angka'] = data_merged['Bulan'].map(BULAN_MAPPING)
+    return data_merged
+
+
+# Sidik jari isi DataFrame (nama kolom + nilai), dipakai sebagai kunci cache
+def hash_frames(*frames):
+    h = hashlib.sha1()
+    for frame in frames:
+        h.update(repr(list(frame.columns)).encode())
+        h.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+PREFIX_HUJAN = 'Intensitas_'
+PREFIX_PADI = 'Jumlah_Produksi_Beras_'
+# Kolom identitas baris pada tabel lebar; 'Wilayah' (kabupaten/kota) bersifat opsional
+ID_COLUMNS = ['Wilayah', 'Bulan']
+
+
+def id_columns(frame):
+    return [c for c in ID_COLUMNS if c in frame.columns]
+
+
+# Ambil kolom tahun dari tabel lebar, mis. "Intensitas_2020" -> {"2020": "Intensitas_2020"}
+def parse_year_columns(frame, prefix):
+    kolom = [c for c in frame.columns if c not in ID_COLUMNS]
+    salah = [c for c in kolom if not c.startswith(prefix)]
+    if salah:
+        raise ValueError(f"Kolom tidak dikenali (harus diawali '{prefix}'): {salah}")
+    return {c.replace(prefix, ''): c for c in kolom}
+
+
+# Laporan tahun yang hanya ada di salah satu dataset (pd.merge membuangnya diam-diam)
+def year_mismatch(curah_hujan, produksi_padi):
+    tahun_hujan = parse_year_columns(curah_hujan, PREFIX_HUJAN)
+    tahun_padi = parse_year_columns(produksi_padi, PREFIX_PADI)
+    return {
+        'hanya_hujan': [t for t in tahun_hujan if t not in tahun_padi],
+        'hanya_padi': [t for t in tahun_padi if t not in tahun_hujan],
+    }
+
+
+# Versi vektor dari preprocess_data: kolom tahun dicocokkan sekali, lalu nilai kedua tabel
+# disusun berdampingan dengan NumPy tanpa melt dan tanpa join string per baris.
+# Hasilnya identik dengan preprocess_data; typed=True langsung menghasilkan tipe ringkas.
+# Bila kedua tabel memiliki kolom 'Wilayah', baris dicocokkan per (Wilayah, Bulan) dan
+# kolom 'Wilayah' ikut ada di hasil.
+def reshape_wide(curah_hujan, produksi_padi, strict=False, typed=False):
+    tahun_hujan = parse_year_columns(curah_hujan, PREFIX_HUJAN)
+    tahun_padi = parse_year_columns(produksi_padi, PREFIX_PADI)
+    if strict:
+        selisih = year_mismatch(curah_hujan, produksi_padi)
+        if selisih['hanya_hujan'] or selisih['hanya_padi']:
+            raise ValueError(f"Tahun tidak cocok antara kedua dataset: {selisih}")
+    tahun = [t for t in tahun_hujan if t in tahun_padi]
+
+    kunci = id_columns(curah_hujan)
+    if kunci != id_columns(produksi_padi):
+        raise ValueError("Kolom 'Wilayah' harus ada di kedua dataset atau tidak sama sekali")
+    for nama, frame in [('curah hujan', curah_hujan), ('produksi padi', produksi_padi)]:
+        if frame.duplicated(kunci).any():
+            raise ValueError(f"Kolom {kunci} pada dataset {nama} mengandung duplikat")
+
+    # Baris padi disejajarkan dengan urutan (wilayah,) bulan pada tabel hujan
+    bulan_hujan = curah_hujan['Bulan']
+    if curah_hujan[kunci].equals(produksi_padi[kunci]):
+        baris_hujan = np.arange(len(curah_hujan))
+        baris_padi = baris_hujan
+    else:
+        kunci_padi = pd.MultiIndex.from_frame(produksi_padi[kunci]) if len(kunci) > 1 \
+            else pd.Index(produksi_padi['Bulan'])
+        kunci_hujan = pd.MultiIndex.from_frame(curah_hujan[kunci]) if len(kunci) > 1 else bulan_hujan
+        posisi = kunci_padi.get_indexer(kunci_hujan)
+        baris_hujan = np.flatnonzero(posisi >= 0)
+        baris_padi = posisi[baris_hujan]
+
+    n_baris, n_tahun = len(baris_hujan), len(tahun)
+    hujan = curah_hujan[[tahun_hujan[t] for t in tahun]].to_numpy()[baris_hujan]
+    padi = produksi_padi[[tahun_padi[t] for t in tahun]].to_numpy()[baris_padi]
+    urutan = np.tile(baris_hujan, n_tahun)
+
+    if typed:
+        # Kode kategori dihitung sekali per baris bulan lalu diulang; bulan tidak dikenal -> Bulan_Angka 0
+        kode = pd.Categorical(bulan_hujan, categories=list(BULAN_MAPPING)).codes[urutan]
+        wilayah = {}
+        if 'Wilayah' in kunci:
+            kategori_wilayah = pd.Categorical(curah_hujan['Wilayah'])
+            wilayah['Wilayah'] = pd.Categorical.from_codes(kategori_wilayah.codes[urutan],
+                                                           categories=kategori_wilayah.categories)
+        return pd.DataFrame({
+            **wilayah,
+            'Bulan': pd.Categorical.from_codes(kode, categories=list(BULAN_MAPPING), ordered=True),
+            'Tahun': np.repeat(np.array(tahun, dtype='int16'), n_baris),
+            'Intensitas_Hujan': hujan.astype('float32', order='F').ravel(order='F'),
+            'Jumlah_Produksi_Beras': padi.astype('float32', order='F').ravel(order='F'),
+            'Bulan_Angka': (kode + 1).astype('int8'),
+        })
+
+    kolom_tahun = pd.Index([tahun_hujan[t] for t in tahun]).str.replace(PREFIX_HUJAN, '')
+    wilayah = {}
+    if 'Wilayah' in kunci:
+        wilayah['Wilayah'] = curah_hujan['Wilayah'].take(urutan).reset_index(drop=True)
+    return pd.DataFrame({
+        **wilayah,
+        'Bulan': bulan_hujan.take(urutan).reset_index(drop=True),
+        'Tahun': kolom_tahun.repeat(n_baris),
+        'Intensitas_Hujan': hujan.ravel(order='F'),
+        'Jumlah_Produksi_Beras': padi.ravel(order='F'),
+        'Bulan_Angka': bulan_hujan.map(BULAN_MAPPING).to_numpy()[urutan],
+    })
+
+
+# Tipe kolom yang ringkas untuk data gabungan
+def to_typed(data_merged):
+    wilayah = {}
+    if 'Wilayah' in data_merged.columns:
+        wilayah['Wilayah'] = pd.Categorical(data_merged['Wilayah'])
+    return data_merged.assign(
+        **wilayah,
+        Bulan=pd.Categorical(data_merged['Bulan'], categories=list(BULAN_MAPPING), ordered=True),
+        Tahun=data_merged['Tahun'].astype('int16'),
+        Intensitas_Hujan=data_merged['Intensitas_Hujan'].astype('float32'),
+        Jumlah_Produksi_Beras=data_merged['Jumlah_Produksi_Beras'].astype('float32'),
+        Bulan_Angka=data_merged['Bulan_Angka'].astype('int8'),
+    )
+
+
+# Sidik jari per kolom, agar tahun baru bisa dikenali tanpa membandingkan seluruh data
+def column_fingerprints(frame):
+    return {
+        col: hashlib.sha1(pd.util.hash_pandas_object(frame[col], index=False).values.tobytes()).hexdigest()
+        for col in frame.columns
+    }
+
+
+# Cache data gabungan per upload. Bila upload baru hanya menambah kolom tahun,
+# hanya baris tahun baru yang di-melt lalu ditambahkan ke data yang sudah ada.
+# Sidik jari upload (MergedCache.fingerprint) boleh dihitung sekali oleh pemanggil lalu
+# diteruskan ke get, agar data tidak di-hash ulang setiap kali halaman dijalankan ulang.
+class MergedCache:
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(curah_hujan, produksi_padi):
+        return (
+            tuple(column_fingerprints(curah_hujan).items()),
+            tuple(column_fingerprints(produksi_padi).items()),
+        )
+
+    @staticmethod
+    def _ids(kolom):
+        return {(c, h) for c, h in kolom if c in ID_COLUMNS}
+
+    def _find_base(self, fingerprint):
+        # Cari entri lama dengan kolom identitas yang sama dan kolom tahun (dengan isi yang sama)
+        # yang merupakan bagian dari upload baru
+        hujan_baru, padi_baru = set(fingerprint[0]), set(fingerprint[1])
+        for key in reversed(self._entries):
+            hujan_lama, padi_lama = key
+            if self._ids(hujan_lama) == self._ids(fingerprint[0]) and self._ids(padi_lama) == self._ids(fingerprint[1]) \
+                    and set(hujan_lama) <= hujan_baru and set(padi_lama) <= padi_baru:
+                return key
+        return None
+
+    def get(self, curah_hujan, produksi_padi, fingerprint=None):
+        if fingerprint is None:
+            fingerprint = self.fingerprint(curah_hujan, produksi_padi)
+        with self._lock:
+            if fingerprint in self._entries:
+                self._entries.move_to_end(fingerprint)
+                TELEMETRY.cache_event('merged', hit=True)
+                return self._entries[fingerprint]
+            base = self._find_base(fingerprint)
+            data_lama = self._entries[base] if base is not None else None
+        TELEMETRY.cache_event('merged', hit=False)
+
+        if data_lama is None:
+            with TELEMETRY.span('preprocess'):
+                data_merged = reshape_wide(curah_hujan, produksi_padi, typed=True)
+        else:
+            # Tahun baru = tahun yang kolomnya belum ada di entri lama
+            tahun_baru = {c.replace(PREFIX_HUJAN, '') for c, h in fingerprint[0] if (c, h) not in base[0]}
+            tahun_baru |= {c.replace(PREFIX_PADI, '') for c, h in fingerprint[1] if (c, h) not in base[1]}
+            kolom_hujan = id_columns(curah_hujan) + [c for c in curah_hujan.columns
+                                                     if c.replace(PREFIX_HUJAN, '') in tahun_baru]
+            kolom_padi = id_columns(produksi_padi) + [c for c in produksi_padi.columns
+                                                      if c.replace(PREFIX_PADI, '') in tahun_baru]
+            with TELEMETRY.span('preprocess', incremental=True):
+                tambahan = reshape_wide(curah_hujan[kolom_hujan], produksi_padi[kolom_padi], typed=True)
+                data_merged = pd.concat([data_lama, tambahan], ignore_index=True)
+                # Blok per tahun disusun mengikuti urutan kolom tahun pada upload, sama seperti
+                # hasil reshape_wide penuh, agar isi cache tidak bergantung pada riwayat upload
+                tahun_padi = parse_year_columns(produksi_padi, PREFIX_PADI)
+                posisi = {int(t): i for i, t in enumerate(t for t in parse_year_columns(curah_hujan, PREFIX_HUJAN)
+                                                          if t in tahun_padi)}
+                urutan = data_merged['Tahun'].map(posisi)
+                if not urutan.is_monotonic_increasing:
+                    data_merged = data_merged.take(np.argsort(urutan.to_numpy(), kind='stable')).reset_index(drop=True)
+
+        with self._lock:
+            self._entries[fingerprint] = data_merged
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data_merged
+
+
+# Ringkasan per dataset untuk grafik "Eksplorasi Data": total per tahun (pie chart),
+# matriks korelasi (heatmap) dan rata-rata per (Tahun, Bulan) (grafik tren)
+def summarize(data_merged):
+    kolom = ['Intensitas_Hujan', 'Jumlah_Produksi_Beras']
+    per_tahun = data_merged.groupby('Tahun', observed=True)[kolom].sum()
+    return {
+        'total_hujan': per_tahun['Intensitas_Hujan'],
+        'total_padi': per_tahun['Jumlah_Produksi_Beras'],
+        'corr': data_merged[kolom].corr(),
+        'bulanan': data_merged.groupby(['Tahun', 'Bulan'], observed=True, sort=True)[kolom].mean().reset_index(),
+    }
+
+
+# Ambil satu halaman tabel (halaman dimulai dari 1)
+def paginate(frame, page, page_size=100):
+    start = (page - 1) * page_size
+    return frame.iloc[start:start + page_size]
+
+
+# Sampel acak (tetap untuk seed yang sama) agar grafik titik tidak mengirim jutaan baris
+def downsample(frame, max_rows=5000, seed=0):
+    if len(frame) <= max_rows:
+        return frame
+    return frame.sample(n=max_rows, random_state=seed).sort_index()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from padi.data import BULAN_MAPPING
+
+SEMUA_WILAYAH = 'Semua Wilayah'
+KOLOM_NILAI = ['Intensitas_Hujan', 'Jumlah_Produksi_Beras']
+
+
+# Data gabungan dalam bentuk kubus padat [wilayah, tahun, bulan] (NaN = tidak ada data).
+# Mengambil satu wilayah atau satu periode hanya berupa indexing array (view), tanpa
+# memindai ulang seluruh data gabungan. Data tanpa kolom 'Wilayah' menjadi satu wilayah.
+class RegionDataset:
+    def __init__(self, wilayah, tahun, hujan, padi):
+        self.wilayah = list(wilayah)
+        self.tahun = np.asarray(tahun)
+        self.hujan = hujan
+        self.padi = padi
+        self._posisi_wilayah = {w: i for i, w in enumerate(self.wilayah)}
+        self._posisi_tahun = {int(t): i for i, t in enumerate(self.tahun)}
+
+    @classmethod
+    def from_merged(cls, data_merged):
+        if 'Wilayah' in data_merged.columns:
+            kode_wilayah, wilayah = pd.factorize(data_merged['Wilayah'], sort=True)
+            wilayah = list(wilayah)
+        else:
+            kode_wilayah, wilayah = np.zeros(len(data_merged), dtype=np.intp), [SEMUA_WILAYAH]
+        kode_tahun, tahun = pd.factorize(data_merged['Tahun'].astype(int), sort=True)
+        kode_bulan = data_merged['Bulan_Angka'].to_numpy().astype(np.intp) - 1
+        valid = (kode_bulan >= 0) & (kode_bulan < 12)
+
+        bentuk = (len(wilayah), len(tahun), 12)
+        hujan = np.full(bentuk, np.nan, dtype='float32')
+        padi = np.full(bentuk, np.nan, dtype='float32')
+        indeks = (kode_wilayah[valid], kode_tahun[valid], kode_bulan[valid])
+        hujan[indeks] = data_merged['Intensitas_Hujan'].to_numpy()[valid]
+        padi[indeks] = data_merged['Jumlah_Produksi_Beras'].to_numpy()[valid]
+        return cls(wilayah, np.asarray(tahun), hujan, padi)
+
+    @property
+    def has_regions(self):
+        return self.wilayah != [SEMUA_WILAYAH]
+
+    def _indeks(self, wilayah=None, tahun=None, bulan=None):
+        w = slice(None) if wilayah is None else self._posisi_wilayah[wilayah]
+        t = slice(None) if tahun is None else self._posisi_tahun[int(tahun)]
+        b = slice(None) if bulan is None else int(bulan) - 1
+        return w, t, b
+
+    # Nilai (hujan, padi) untuk potongan yang diminta; None berarti seluruh dimensi
+    def slice(self, wilayah=None, tahun=None, bulan=None):
+        indeks = self._indeks(wilayah, tahun, bulan)
+        return self.hujan[indeks], self.padi[indeks]
+
+    # Potongan kubus sebagai tabel panjang (kolom sama dengan data gabungan bertipe ringkas)
+    def to_frame(self, wilayah=None, tahun=None, bulan=None):
+        w, t, b = self._indeks(wilayah, tahun, bulan)
+        # Jaga tiga dimensi agar posisi hasil np.nonzero bisa dipetakan ke label
+        w, t, b = [slice(i, i + 1) if isinstance(i, int) else i for i in (w, t, b)]
+        hujan, padi = self.hujan[w, t, b], self.padi[w, t, b]
+        iw, it, ib = np.nonzero(~(np.isnan(hujan) | np.isnan(padi)))
+        label_wilayah = np.asarray(self.wilayah, dtype=object)[w][iw]
+        bulan_angka = np.arange(1, 13)[b][ib]
+        frame = pd.DataFrame({
+            'Bulan': pd.Categorical.from_codes(bulan_angka - 1, categories=list(BULAN_MAPPING), ordered=True),
+            'Tahun': self.tahun[t][it].astype('int16'),
+            'Intensitas_Hujan': hujan[iw, it, ib],
+            'Jumlah_Produksi_Beras': padi[iw, it, ib],
+            'Bulan_Angka': bulan_angka.astype('int8'),
+        })
+        if self.has_regions:
+            frame.insert(0, 'Wilayah', pd.Categorical(label_wilayah, categories=self.wilayah))
+        return frame
+
+    # Tabel dengan MultiIndex (Wilayah, Tahun, Bulan_Angka) untuk lookup berlabel
+    def to_indexed(self):
+        frame = self.to_frame()
+        if 'Wilayah' not in frame.columns:
+            frame.insert(0, 'Wilayah', SEMUA_WILAYAH)
+        return frame.set_index(['Wilayah', 'Tahun', 'Bulan_Angka']).sort_index()
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+
+import joblib
+
+
+# Tandai entri cache baru dipakai (dasar urutan LRU di prune_lru)
+def touch(path):
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+# Hapus entri cache (berkas atau direktori di directory yang namanya diawali prefix dan
+# diakhiri suffix) yang paling lama tidak dipakai menurut mtime, sampai tersisa max_entries.
+# Berkas sementara (.tmp) milik penulis yang masih berjalan dilewati. Proses lain yang
+# masih memory-map berkas yang dihapus tetap bisa memakainya sampai berkasnya ditutup.
+def prune_lru(directory, max_entries, prefix='', suffix=''):
+    entri = []
+    for nama in os.listdir(directory):
+        if nama.startswith(prefix) and nama.endswith(suffix) and not nama.endswith('.tmp'):
+            path = os.path.join(directory, nama)
+            try:
+                entri.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue
+    entri.sort()
+    for _, path in entri[:max(len(entri) - max_entries, 0)]:
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+# Tulis objek dengan joblib ke berkas sementara unik lalu pindahkan ke path dengan satu
+# rename, sehingga pembaca tidak pernah memuat berkas yang setengah tertulis
+def dump_atomic(obj, path):
+    fd, sementara = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        joblib.dump(obj, sementara)
+        os.replace(sementara, path)
+    except BaseException:
+        if os.path.exists(sementara):
+            os.remove(sementara)
+        raise
@@ -0,0 +1,174 @@
+import io
+import threading
+from collections import OrderedDict
+
+import seaborn as sns
+from matplotlib.figure import Figure
+
+from padi.telemetry import TELEMETRY
+
+
+# Grafik dibuat dengan objek Figure langsung (bukan pyplot) sehingga tidak tercatat di
+# state global pyplot dan aman dipakai bersamaan oleh beberapa sesi Streamlit.
+# Tiap fungsi menerima data yang sudah diringkas (lihat padi.data.summarize), bukan data mentah.
+def _data_plot(data):
+    # Tahun sebagai teks agar hue seaborn tetap diskrit
+    return data.assign(Tahun=data['Tahun'].astype(str))
+
+
+# data: data gabungan (boleh berupa sampel, lihat padi.data.downsample)
+def plot_scatter(data):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.scatterplot(data=_data_plot(data), x='Intensitas_Hujan', y='Jumlah_Produksi_Beras', hue='Tahun', ax=ax)
+    ax.set_title("Hubungan Curah Hujan dan Produksi Padi")
+    return fig
+
+
+# data: rata-rata per (Tahun, Bulan), yaitu summarize(...)['bulanan']
+def _plot_tren(data, kolom, judul, label_y):
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    sns.lineplot(data=_data_plot(data), x='Bulan', y=kolom, hue='Tahun', marker='o', palette='tab10', ax=ax)
+    ax.set_title(judul, fontsize=14)
+    ax.set_xlabel('Bulan', fontsize=12)
+    ax.set_ylabel(label_y, fontsize=12)
+    ax.legend(title='Tahun')
+    ax.grid()
+    return fig
+
+
+def plot_tren_hujan(data):
+    return _plot_tren(data, 'Intensitas_Hujan', 'Tren Bulanan Curah Hujan', 'Intensitas Hujan (mm³)')
+
+
+def plot_tren_padi(data):
+    return _plot_tren(data, 'Jumlah_Produksi_Beras', 'Tren Bulanan Produksi Beras', 'Produksi Beras (ton)')
+
+
+def plot_hujan_padi(data):
+    data_plot = _data_plot(data)
+    fig = Figure(figsize=(12, 6))
+    ax1 = fig.subplots()
+    ax2 = ax1.twinx()
+    sns.lineplot(data=data_plot, x='Bulan', y='Intensitas_Hujan', hue='Tahun', marker='o', ax=ax1, palette='Blues')
+    sns.lineplot(data=data_plot, x='Bulan', y='Jumlah_Produksi_Beras', hue='Tahun', marker='s', ax=ax2, palette='Greens')
+
+    ax1.set_title("Curah Hujan dan Produksi Padi per Bulan", fontsize=14)
+    ax1.set_xlabel('Bulan', fontsize=12)
+    ax1.set_ylabel('Intensitas Hujan (mm³)', fontsize=12, color='blue')
+    ax2.set_ylabel('Jumlah Produksi Padi (ton)', fontsize=12, color='green')
+    ax2.grid()
+    return fig
+
+
+def _plot_pie(total, judul, palette):
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    ax.pie(total, labels=total.index, autopct='%1.1f%%', colors=sns.color_palette(palette), startangle=90)
+    ax.set_title(judul)
+    return fig
+
+
+# data: total per tahun, yaitu summarize(...)['total_hujan']
+def plot_pie_hujan(data):
+    return _plot_pie(data, "Distribusi Total Curah Hujan per Tahun", 'Blues')
+
+
+# data: summarize(...)['total_padi']
+def plot_pie_padi(data):
+    return _plot_pie(data, "Distribusi Total Produksi Padi per Tahun", 'Greens')
+
+
+# data: matriks korelasi, yaitu summarize(...)['corr']
+def plot_heatmap(data):
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    sns.heatmap(data, annot=True, cmap='coolwarm', fmt='.2f', ax=ax)
+    ax.set_title('Heatmap Korelasi Variabel Numerik', fontsize=14)
+    return fig
+
+
+# data: hasil train_evaluasi ditambah 'y_range' (min, maks produksi seluruh data)
+def plot_prediksi_aktual(data):
+    y_min, y_max = data['y_range']
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.scatter(data['y_test'], data['y_pred'], alpha=0.7, label="Prediksi")
+    ax.plot([y_min, y_max], [y_min, y_max], '--r', linewidth=2, label="Perfect Fit")
+    ax.set_title("Prediksi vs Data Aktual", fontsize=14)
+    ax.set_xlabel("Produksi Padi Aktual (ton)", fontsize=12)
+    ax.set_ylabel("Produksi Padi Prediksi (ton)", fontsize=12)
+    ax.legend()
+    ax.grid()
+    return fig
+
+
+# data: hasil train_evaluasi
+def plot_intensitas_prediksi(data):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.scatter(data['X_test']['Intensitas_Hujan'], data['y_test'], alpha=0.7, label="Aktual", c="blue")
+    ax.scatter(data['X_test']['Intensitas_Hujan'], data['y_pred'], alpha=0.7, label="Prediksi", c="orange")
+    ax.set_title("Intensitas Hujan vs Produksi Padi", fontsize=14)
+    ax.set_xlabel("Intensitas Hujan (mm³)", fontsize=12)
+    ax.set_ylabel("Produksi Padi (ton)", fontsize=12)
+    ax.legend()
+    ax.grid()
+    return fig
+
+
+CHARTS = {
+    'scatter': plot_scatter,
+    'tren_hujan': plot_tren_hujan,
+    'tren_padi': plot_tren_padi,
+    'hujan_padi': plot_hujan_padi,
+    'pie_hujan': plot_pie_hujan,
+    'pie_padi': plot_pie_padi,
+    'heatmap': plot_heatmap,
+    'prediksi_aktual': plot_prediksi_aktual,
+    'intensitas_prediksi': plot_intensitas_prediksi,
+}
+
+
+# Render Figure ke bytes lalu tutup figure-nya agar memori server tidak bertambah
+def render_bytes(fig, fmt='png'):
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format=fmt, bbox_inches='tight')
+    finally:
+        fig.clear()
+    return buf.getvalue()
+
+
+# Cache gambar grafik per (hash dataset, jenis grafik, format). Entri lama dibuang
+# (LRU) bila total ukuran melebihi max_bytes. data boleh berupa fungsi tanpa argumen
+# agar ringkasan hanya dihitung bila gambar belum ada di cache.
+class FigureCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, data_hash, chart, data, fmt='png'):
+        key = (data_hash, chart, fmt)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                TELEMETRY.cache_event('figure', hit=True)
+                return self._entries[key]
+        TELEMETRY.cache_event('figure', hit=False)
+
+        with TELEMETRY.span('render', chart=chart):
+            if callable(data):
+                data = data()
+            gambar = render_bytes(CHARTS[chart](data), fmt)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = gambar
+                self.total_bytes += len(gambar)
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, lama = self._entries.popitem(last=False)
+                self.total_bytes -= len(lama)
+        return gambar
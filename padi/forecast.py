@@ -0,0 +1,176 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from padi.dataset import RegionDataset
+from padi.scoring import KOLOM_PREDIKSI
+from padi.telemetry import TELEMETRY
+
+LAGS = (1, 2, 3, 4)
+WINDOWS = (3, 6)
+
+
+# Deret bulanan per wilayah dari kubus [wilayah, tahun, bulan]; tahun yang tidak ada
+# di antara tahun pertama dan terakhir diisi NaN agar jarak antarbulan tetap benar
+def monthly_series(dataset):
+    tahun = np.arange(int(dataset.tahun.min()), int(dataset.tahun.max()) + 1)
+    posisi = np.searchsorted(tahun, dataset.tahun.astype(int))
+    bentuk = (len(dataset.wilayah), len(tahun), 12)
+    hujan = np.full(bentuk, np.nan, dtype='float32')
+    padi = np.full(bentuk, np.nan, dtype='float32')
+    hujan[:, posisi] = dataset.hujan
+    padi[:, posisi] = dataset.padi
+    return int(tahun[0]), hujan.reshape(len(dataset.wilayah), -1), padi.reshape(len(dataset.wilayah), -1)
+
+
+def feature_names(lags=LAGS, windows=WINDOWS):
+    return (['Intensitas_Hujan'] + [f'Hujan_Lag_{k}' for k in lags]
+            + [f'Hujan_Jumlah_{w}' for w in windows] + ['Bulan_Angka'])
+
+
+# Fitur untuk kolom waktu [start, T) dari deret hujan (wilayah x T): hujan saat ini,
+# lag 1..4 bulan dan jumlah bergulir (musiman). Semua operasi berupa pergeseran dan
+# selisih cumsum sehingga biayanya linear; NaN di dalam jendela menghasilkan NaN.
+def _lag_features(hujan, start, bulan_awal, lags=LAGS, windows=WINDOWS):
+    n_wilayah, n_waktu = hujan.shape
+    kolom = [hujan[:, start:]]
+    for k in lags:
+        lag = np.full((n_wilayah, n_waktu - start), np.nan, dtype='float32')
+        awal = max(start, k)
+        # Deret yang lebih pendek dari lag tidak punya nilai lag sama sekali
+        if awal < n_waktu:
+            lag[:, awal - start:] = hujan[:, awal - k:n_waktu - k]
+        kolom.append(lag)
+
+    nol = np.nan_to_num(hujan, nan=0.0).astype('float64')
+    jumlah = np.concatenate([np.zeros((n_wilayah, 1)), np.cumsum(nol, axis=1)], axis=1)
+    n_nan = np.concatenate([np.zeros((n_wilayah, 1)), np.cumsum(np.isnan(hujan), axis=1)], axis=1)
+    t = np.arange(start, n_waktu)
+    for w in windows:
+        dari = np.maximum(t + 1 - w, 0)
+        total = jumlah[:, t + 1] - jumlah[:, dari]
+        lengkap = (n_nan[:, t + 1] - n_nan[:, dari] == 0) & (t + 1 >= w)
+        kolom.append(np.where(lengkap, total, np.nan).astype('float32'))
+
+    bulan = ((bulan_awal - 1 + t) % 12 + 1).astype('float32')
+    kolom.append(np.broadcast_to(bulan, (n_wilayah, len(t))))
+    return np.stack(kolom, axis=-1)
+
+
+# Matriks fitur lag yang bisa diperpanjang: data bulan baru hanya menghitung fitur
+# untuk bulan-bulan baru, memakai ekor riwayat sepanjang lag/jendela terpanjang
+class LagFeatures:
+    def __init__(self, n_wilayah, lags=LAGS, windows=WINDOWS):
+        self.lags = lags
+        self.windows = windows
+        self.riwayat = max(max(lags), max(windows) - 1)
+        self.hujan = np.empty((n_wilayah, 0), dtype='float32')
+        self._blok = []
+        self._matrix = None
+
+    @property
+    def n_waktu(self):
+        return self.hujan.shape[1]
+
+    def extend(self, hujan_baru):
+        hujan_baru = np.asarray(hujan_baru, dtype='float32')
+        ekor = self.hujan[:, max(self.n_waktu - self.riwayat, 0):]
+        # Bulan ke-0 deret selalu Januari (deret dimulai dari awal tahun)
+        bulan_awal = (self.n_waktu - ekor.shape[1]) % 12 + 1
+        gabungan = np.concatenate([ekor, hujan_baru], axis=1)
+        self._blok.append(_lag_features(gabungan, ekor.shape[1], bulan_awal, self.lags, self.windows))
+        self.hujan = np.concatenate([self.hujan, hujan_baru], axis=1)
+        self._matrix = None
+        return self
+
+    # Array [wilayah, waktu, fitur]
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            if len(self._blok) > 1:
+                self._blok = [np.concatenate(self._blok, axis=1)]
+            self._matrix = self._blok[0] if self._blok else np.empty((self.hujan.shape[0], 0, len(feature_names())))
+        return self._matrix
+
+
+# Menyimpan LagFeatures per daftar wilayah. Bila dataset baru adalah perpanjangan deret
+# yang sudah ada (mis. upload menambah tahun baru), hanya bulan baru yang dihitung; bila
+# dataset adalah awalan deret yang tersimpan, fiturnya diambil dari bulan-bulan awal.
+# get mengembalikan potongan matriks sepanjang deret dataset itu sendiri, diambil di
+# dalam lock, sehingga perpanjangan oleh sesi lain tidak mengubah hasil yang sudah diambil.
+class FeatureStore:
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, dataset):
+        tahun_awal, hujan, padi = monthly_series(dataset)
+        key = (tuple(dataset.wilayah), tahun_awal)
+        n_waktu = hujan.shape[1]
+        with self._lock:
+            fitur = self._entries.get(key)
+            lama = min(fitur.n_waktu, n_waktu) if fitur is not None else 0
+            sama = fitur is not None and np.array_equal(fitur.hujan[:, :lama], hujan[:, :lama], equal_nan=True)
+            TELEMETRY.cache_event('lag_features', hit=sama)
+            if not sama:
+                fitur = LagFeatures(len(dataset.wilayah))
+            if n_waktu > fitur.n_waktu:
+                with TELEMETRY.span('lag_features'):
+                    fitur.extend(hujan[:, fitur.n_waktu:])
+            self._entries[key] = fitur
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            # extend tidak pernah menulis ke array lama, jadi potongan ini tidak ikut berubah
+            X = fitur.matrix[:, :n_waktu]
+        return tahun_awal, X, padi
+
+
+FEATURE_STORE = FeatureStore()
+
+
+# Strategi langsung: satu model per horizon h, memetakan fitur pada bulan t ke produksi
+# bulan t+h (fitur bulan target diganti dengan bulan t+h). Dipakai lewat
+# ModelRegistry mode 'forecast'; params boleh berisi 'horizon' (default 3).
+def train_forecast(data_merged, params, store=FEATURE_STORE):
+    from sklearn.ensemble import RandomForestRegressor
+
+    params = dict(params)
+    horizon = params.pop('horizon', 3)
+    dataset = RegionDataset.from_merged(data_merged)
+    tahun_awal, X_semua, padi = store.get(dataset)
+
+    models = {}
+    for h in range(1, horizon + 1):
+        X = X_semua[:, :-h].copy()
+        X[..., -1] = (X[..., -1] + h - 1) % 12 + 1
+        y = padi[:, h:]
+        valid = ~np.isnan(X).any(axis=-1) & ~np.isnan(y)
+        if valid.sum() < 2:
+            raise ValueError(f"Data terlalu sedikit untuk prakiraan {h} bulan ke depan")
+        model = RandomForestRegressor(**params)
+        model.fit(X[valid], y[valid])
+        models[h] = model
+    return {'models': models, 'wilayah': list(dataset.wilayah), 'feature_names': feature_names()}
+
+
+# Prakiraan produksi 1..horizon bulan setelah bulan terakhir yang fiturnya lengkap,
+# per wilayah, memakai model hasil train_forecast
+def forecast(entry, data_merged, store=FEATURE_STORE):
+    dataset = RegionDataset.from_merged(data_merged)
+    tahun_awal, X_semua, _ = store.get(dataset)
+
+    baris = []
+    for r, wilayah in enumerate(dataset.wilayah):
+        lengkap = np.flatnonzero(~np.isnan(X_semua[r]).any(axis=-1))
+        if len(lengkap) == 0:
+            continue
+        t = lengkap[-1]
+        for h, model in entry['models'].items():
+            x = X_semua[r, t].copy()
+            x[-1] = (x[-1] + h - 1) % 12 + 1
+            tahun, bulan = divmod(t + h, 12)
+            baris.append({'Wilayah': wilayah, 'Tahun': tahun_awal + tahun, 'Bulan_Angka': bulan + 1,
+                          'Horizon': h, KOLOM_PREDIKSI: model.predict(x[None, :])[0]})
+    return pd.DataFrame(baris)
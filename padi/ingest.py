@@ -0,0 +1,118 @@
+import hashlib
+import os
+import re
+import tempfile
+
+import pandas as pd
+
+from padi.data import BULAN_MAPPING, ID_COLUMNS, PREFIX_HUJAN, PREFIX_PADI
+from padi.diskcache import prune_lru, touch
+from padi.telemetry import TELEMETRY
+
+BULAN_DTYPE = pd.CategoricalDtype(categories=list(BULAN_MAPPING), ordered=True)
+
+
+# Validasi header: kolom 'Bulan', opsional 'Wilayah', sisanya '<prefix><tahun>'
+def build_schema(columns, prefix):
+    columns = list(columns)
+    if 'Bulan' not in columns:
+        raise ValueError("Kolom 'Bulan' tidak ditemukan")
+    pola = re.compile(rf"^{re.escape(prefix)}\d{{4}}$")
+    salah = [c for c in columns if c not in ID_COLUMNS and not pola.match(c)]
+    if salah:
+        raise ValueError(f"Kolom tidak sesuai pola '{prefix}<tahun>': {salah}")
+    if len(set(columns)) != len(columns):
+        raise ValueError("Terdapat nama kolom ganda")
+    return {c: (str if c in ID_COLUMNS else 'float32') for c in columns}
+
+
+# Baca CSV per potongan dengan tipe eksplisit; tiap potongan divalidasi saat dibaca
+def iter_chunks(file, prefix, chunksize=50_000):
+    header = pd.read_csv(file, nrows=0).columns
+    schema = build_schema(header, prefix)
+    file.seek(0)
+    try:
+        for chunk in pd.read_csv(file, dtype=schema, chunksize=chunksize):
+            bulan_salah = ~chunk['Bulan'].isin(BULAN_MAPPING)
+            if bulan_salah.any():
+                raise ValueError(f"Nama bulan tidak dikenal: {chunk.loc[bulan_salah, 'Bulan'].unique()[:5].tolist()}")
+            if 'Wilayah' in chunk.columns and chunk['Wilayah'].isna().any():
+                raise ValueError("Kolom 'Wilayah' tidak boleh kosong")
+            chunk['Bulan'] = chunk['Bulan'].astype(BULAN_DTYPE)
+            yield chunk
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Isi file tidak valid: {e}") from e
+
+
+def _hash_file(file, block=1 << 20):
+    h = hashlib.sha1()
+    file.seek(0)
+    for data in iter(lambda: file.read(block), b''):
+        h.update(data)
+    file.seek(0)
+    return h.hexdigest()
+
+
+# Tulis potongan langsung ke file Feather (Arrow IPC) tanpa menampung seluruh tabel di memori
+def _write_feather(chunks, path):
+    import pyarrow as pa
+
+    # Nama sementara unik agar beberapa proses yang menulis upload yang sama tidak bertabrakan
+    fd, sementara = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.close(fd)
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pa.ipc.new_file(sementara, schema)
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        os.remove(sementara)
+        raise
+    if writer is None:
+        os.remove(sementara)
+        raise ValueError("File tidak berisi data")
+    writer.close()
+    os.replace(sementara, path)
+
+
+# Baca cache Feather dengan memory map; kolom numerik tidak disalin ke memori proses
+def load_feather(path):
+    import pyarrow.feather as feather
+
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+
+# Ingest file upload: hasilnya disimpan sebagai Feather per isi file, sehingga upload yang sama
+# (dari sesi mana pun) cukup di-memory-map. Tanpa pyarrow, data dibaca langsung ke memori.
+# Cache disk dibatasi max_disk_entries berkas; yang paling lama tidak dipakai dihapus.
+def ingest_upload(file, prefix, cache_dir=None, chunksize=50_000, max_disk_entries=64):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        cache_dir = None
+    with TELEMETRY.span('ingest', dataset=prefix.rstrip('_')):
+        if not cache_dir:
+            return pd.concat(iter_chunks(file, prefix, chunksize), ignore_index=True)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, f"{prefix.rstrip('_')}_{_hash_file(file)}.feather")
+        ada = os.path.exists(path)
+        TELEMETRY.cache_event('upload', hit=ada)
+        if ada:
+            touch(path)
+        else:
+            _write_feather(iter_chunks(file, prefix, chunksize), path)
+            prune_lru(cache_dir, max_disk_entries, suffix='.feather')
+        return load_feather(path)
+
+
+def ingest_hujan(file, cache_dir=None, chunksize=50_000, max_disk_entries=64):
+    return ingest_upload(file, PREFIX_HUJAN, cache_dir, chunksize, max_disk_entries)
+
+
+def ingest_padi(file, cache_dir=None, chunksize=50_000, max_disk_entries=64):
+    return ingest_upload(file, PREFIX_PADI, cache_dir, chunksize, max_disk_entries)
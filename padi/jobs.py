@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from padi.telemetry import TELEMETRY
+
+
+# Satu pekerjaan pelatihan; future yang sama dibagikan ke semua sesi yang
+# meminta model dengan dataset, hyperparameter dan mode yang sama
+class TrainingJob:
+    def __init__(self, key, mode, future=None):
+        self.key = key
+        self.mode = mode
+        self.future = future or Future()
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+
+    @property
+    def status(self):
+        if self.future.done():
+            return 'gagal' if self.future.exception() is not None else 'selesai'
+        return 'berjalan' if self.started is not None else 'menunggu'
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.submitted
+
+    def done(self):
+        return self.future.done()
+
+    def exception(self):
+        return self.future.exception() if self.future.done() else None
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+
+# Antrean pelatihan di latar yang dibagi ke semua sesi. Job identik (kunci registry:
+# hash dataset + hyperparameter + mode) hanya dilatih sekali; permintaan berikutnya
+# mendapat job yang sedang berjalan, atau job selesai bila model sudah ada di registry.
+# max_workers membatasi jumlah fit yang berjalan bersamaan.
+class TrainingQueue:
+    def __init__(self, registry, max_workers=1):
+        self.registry = registry
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='padi-train')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, curah_hujan, produksi_padi, params=None, mode='evaluasi', data_hash=None):
+        key = self.registry.key_for(curah_hujan, produksi_padi, params, mode, data_hash)
+        with self._lock:
+            job = self._jobs.get(key)
+            TELEMETRY.cache_event('training_job', hit=job is not None)
+            if job is not None:
+                return job
+
+            entry = self.registry.get(key)
+            if entry is not None:
+                job = TrainingJob(key, mode)
+                job.future.set_result(entry)
+                job.finished = job.submitted
+                return job
+
+            job = TrainingJob(key, mode)
+            self._jobs[key] = job
+            self._executor.submit(self._run, job, curah_hujan, produksi_padi, params, data_hash)
+            return job
+
+    # Hasil diteruskan ke future milik job (yang dipegang semua sesi). Job dilepas dari
+    # antrean sebelum future diselesaikan, tanpa callback yang bisa berjalan di thread
+    # pemanggil submit yang sedang memegang lock; model yang berhasil kini tersimpan di
+    # registry dan job yang gagal boleh diulang.
+    def _run(self, job, curah_hujan, produksi_padi, params, data_hash):
+        job.started = time.perf_counter()
+        try:
+            entry = self.registry.get_or_train(curah_hujan, produksi_padi, params, job.mode, data_hash)
+        except BaseException as e:
+            self._release(job)
+            job.future.set_exception(e)
+        else:
+            self._release(job)
+            job.future.set_result(entry)
+
+    def _release(self, job):
+        job.finished = time.perf_counter()
+        with self._lock:
+            self._jobs.pop(job.key, None)
+
+    def pending(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import joblib
+
+from padi.artifact import load_entry, save_entry
+from padi.data import hash_frames, reshape_wide
+from padi.diskcache import prune_lru, touch
+from padi.telemetry import TELEMETRY
+
+FITUR = ['Intensitas_Hujan', 'Bulan_Angka']
+TARGET = 'Jumlah_Produksi_Beras'
+DEFAULT_PARAMS = {'n_estimators': 100, 'random_state': 42}
+
+
+# Data gabungan bertipe ringkas, sama dengan yang dipakai aplikasi Streamlit
+def preprocess_typed(curah_hujan, produksi_padi):
+    with TELEMETRY.span('preprocess'):
+        return reshape_wide(curah_hujan, produksi_padi, typed=True)
+
+
+# Model untuk halaman "Model dan Evaluasi": latih 80%, uji 20%.
+# scikit-learn diimpor di dalam fungsi agar modul ini ringan diimpor (mis. oleh CLI).
+def train_evaluasi(data_merged, params):
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_squared_error, r2_score
+    from sklearn.model_selection import train_test_split
+
+    X = data_merged[FITUR]
+    y = data_merged[TARGET]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    model = RandomForestRegressor(**params)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    return {
+        'model': model,
+        'mse': mean_squared_error(y_test, y_pred),
+        'r2': r2_score(y_test, y_pred),
+        'X_test': X_test,
+        'y_test': y_test,
+        'y_pred': y_pred,
+    }
+
+
+# Model untuk halaman "Prediksi": dilatih dengan seluruh data
+def train_penuh(data_merged, params):
+    from sklearn.ensemble import RandomForestRegressor
+
+    model = RandomForestRegressor(**params)
+    model.fit(data_merged[FITUR], data_merged[TARGET])
+    return {'model': model}
+
+
+# Satu model per wilayah, dilatih paralel antar wilayah (thread: pembangunan pohon
+# scikit-learn melepas GIL). Dipakai bila data memiliki kolom 'Wilayah'.
+def train_per_wilayah(data_merged, params, n_jobs=-1):
+    from joblib import Parallel, delayed
+
+    from padi.dataset import RegionDataset
+
+    dataset = RegionDataset.from_merged(data_merged)
+    data_wilayah = [(w, dataset.to_frame(w if dataset.has_regions else None)) for w in dataset.wilayah]
+    params = dict(params, n_jobs=1)
+    hasil = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(train_penuh)(data, params) for _, data in data_wilayah
+    )
+    return {'models': {w: h['model'] for (w, _), h in zip(data_wilayah, hasil)}}
+
+
+# Model prakiraan beberapa bulan ke depan dari fitur lag curah hujan (lihat padi.forecast)
+def train_forecast(data_merged, params):
+    from padi.forecast import train_forecast
+
+    return train_forecast(data_merged, params)
+
+
+TRAINERS = {'evaluasi': train_evaluasi, 'penuh': train_penuh, 'per_wilayah': train_per_wilayah,
+            'forecast': train_forecast}
+
+
+# Registry model terlatih, dikunci dengan hash isi dataset + hyperparameter.
+# Entri yang paling lama tidak dipakai dibuang (LRU); bila cache_dir diisi,
+# entri juga disimpan ke disk sehingga tetap ada setelah server restart. Model disimpan
+# sebagai CompactForest (array NumPy) dan dimuat dengan memory-map tanpa scikit-learn,
+# sehingga beberapa worker berbagi satu salinan model di disk. Di disk disimpan paling
+# banyak max_disk_entries entri; yang paling lama tidak dipakai (mtime) dihapus.
+# preprocess dapat diganti, misalnya dengan MergedCache.get agar data gabungan ikut di-cache.
+class ModelRegistry:
+    def __init__(self, max_entries=8, cache_dir=None, preprocess=preprocess_typed, max_disk_entries=64):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.cache_dir = cache_dir
+        self.preprocess = preprocess
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(data_hash, params, mode):
+        raw = json.dumps([data_hash, params, mode], sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"model_{key}")
+
+    # Entri ditulis lengkap ke direktori sementara unik lalu dipindah ke tempatnya dengan
+    # satu rename. Bila proses lain sudah menyimpan kunci yang sama, salinan ini dibuang.
+    def _save(self, key, entry):
+        path = self._path(key)
+        if os.path.exists(os.path.join(path, 'entry.joblib')):
+            return
+        tmp = tempfile.mkdtemp(dir=self.cache_dir, prefix=f"model_{key}.", suffix='.tmp')
+        try:
+            joblib.dump(save_entry(entry, tmp), os.path.join(tmp, 'entry.joblib'))
+            # Direktori tanpa entry.joblib hanyalah sisa penulisan yang terputus
+            if os.path.isdir(path) and not os.path.exists(os.path.join(path, 'entry.joblib')):
+                shutil.rmtree(path, ignore_errors=True)
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.exists(os.path.join(path, 'entry.joblib')):
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _load(self, key):
+        path = self._path(key)
+        if os.path.exists(os.path.join(path, 'entry.joblib')):
+            touch(path)
+            try:
+                return load_entry(joblib.load(os.path.join(path, 'entry.joblib')), path)
+            except FileNotFoundError:
+                # Dihapus prune_lru proses lain saat sedang dimuat; dilatih ulang
+                return None
+        return None
+
+    def _put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # Baca dan tulis disk dilakukan di luar lock agar hit di memori dari sesi lain
+    # tidak menunggu; _save/_load aman dijalankan bersamaan (rename atomik)
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        entry = self._load(key) if self.cache_dir else None
+        if entry is not None:
+            with self._lock:
+                self._put(key, entry)
+        return entry
+
+    # data_hash = hash_frames(curah_hujan, produksi_padi); boleh diberikan pemanggil yang
+    # sudah menghitungnya sekali per upload
+    def key_for(self, curah_hujan, produksi_padi, params=None, mode='evaluasi', data_hash=None):
+        params = dict(DEFAULT_PARAMS, **(params or {}))
+        if data_hash is None:
+            data_hash = hash_frames(curah_hujan, produksi_padi)
+        return self.make_key(data_hash, params, mode)
+
+    def get_or_train(self, curah_hujan, produksi_padi, params=None, mode='evaluasi', data_hash=None):
+        key = self.key_for(curah_hujan, produksi_padi, params, mode, data_hash)
+        params = dict(DEFAULT_PARAMS, **(params or {}))
+        entry = self.get(key)
+        TELEMETRY.cache_event('model', hit=entry is not None)
+        if entry is not None:
+            return entry
+
+        data_merged = self.preprocess(curah_hujan, produksi_padi)
+        with TELEMETRY.span('fit', mode=mode):
+            entry = TRAINERS[mode](data_merged, params)
+        with self._lock:
+            self._put(key, entry)
+        if self.cache_dir:
+            self._save(key, entry)
+            prune_lru(self.cache_dir, self.max_disk_entries, prefix='model_')
+        return entry
@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from padi.data import BULAN_MAPPING
+from padi.model import FITUR
+from padi.telemetry import TELEMETRY
+
+KOLOM_PREDIKSI = 'Prediksi_Produksi_Beras'
+
+
+# Siapkan fitur model dari tabel skenario. Bulan boleh berupa angka (Bulan_Angka)
+# atau nama bulan (Bulan); kolom lain (mis. Wilayah) ikut disalin ke hasil.
+def prepare_features(scenario):
+    if 'Intensitas_Hujan' not in scenario.columns:
+        raise ValueError("Skenario harus memiliki kolom 'Intensitas_Hujan'")
+    if 'Bulan_Angka' in scenario.columns:
+        bulan = pd.to_numeric(scenario['Bulan_Angka'], errors='coerce')
+    elif 'Bulan' in scenario.columns:
+        bulan = scenario['Bulan'].astype(str).map(BULAN_MAPPING)
+    else:
+        raise ValueError("Skenario harus memiliki kolom 'Bulan_Angka' atau 'Bulan'")
+    if not (bulan.between(1, 12) & (bulan % 1 == 0)).all():
+        raise ValueError("Nilai bulan harus bilangan bulat 1-12 atau nama bulan (Januari-Desember)")
+    intensitas = pd.to_numeric(scenario['Intensitas_Hujan'], errors='coerce')
+    if intensitas.isna().any():
+        raise ValueError("Kolom 'Intensitas_Hujan' harus berisi angka")
+    return pd.DataFrame({'Intensitas_Hujan': intensitas.to_numpy(), 'Bulan_Angka': bulan.to_numpy()},
+                        columns=FITUR)
+
+
+# Prediksi dengan model per wilayah ({wilayah: model}); baris dikelompokkan per wilayah
+def _predict_regions(models, chunk, fitur):
+    if 'Wilayah' not in chunk.columns:
+        raise ValueError("Model per wilayah membutuhkan kolom 'Wilayah' pada skenario")
+    # groupby membuang kunci kosong, sehingga baris tanpa wilayah harus ditolak di sini
+    if chunk['Wilayah'].isna().any():
+        raise ValueError("Kolom 'Wilayah' pada skenario tidak boleh kosong")
+    prediksi = np.empty(len(chunk))
+    for wilayah, posisi in chunk.groupby('Wilayah', observed=True, sort=False).indices.items():
+        if wilayah not in models:
+            raise ValueError(f"Tidak ada model untuk wilayah: {wilayah}")
+        prediksi[posisi] = models[wilayah].predict(fitur.iloc[posisi])
+    return prediksi
+
+
+# Skor skenario per potongan; tiap potongan diprediksi sekaligus (vektor), bukan per baris.
+# model boleh berupa satu model atau dict {wilayah: model} (lihat train_per_wilayah).
+# Skenario kosong tetap menghasilkan satu potongan kosong: kolomnya divalidasi dan header ikut ditulis.
+def iter_scores(model, scenario, chunk_size=100_000):
+    for start in range(0, max(len(scenario), 1), chunk_size):
+        chunk = scenario.iloc[start:start + chunk_size]
+        with TELEMETRY.span('predict'):
+            fitur = prepare_features(chunk)
+            if len(chunk) == 0:
+                prediksi = np.array([], dtype=float)
+            elif isinstance(model, dict):
+                prediksi = _predict_regions(model, chunk, fitur)
+            else:
+                prediksi = model.predict(fitur)
+        yield chunk.assign(**{KOLOM_PREDIKSI: prediksi})
+
+
+def score_frame(model, scenario, chunk_size=100_000):
+    return pd.concat(iter_scores(model, scenario, chunk_size))
+
+
+# Skor file CSV skenario secara streaming: dibaca, diprediksi dan ditulis per potongan.
+# src/dst boleh berupa path atau objek file. Mengembalikan statistik throughput.
+def score_csv(model, src, dst, chunk_size=100_000):
+    mulai = time.perf_counter()
+    n_baris = 0
+    out = open(dst, 'w', newline='') if isinstance(dst, str) else dst
+    try:
+        try:
+            chunks = pd.read_csv(src, chunksize=chunk_size)
+        except pd.errors.EmptyDataError as e:
+            raise ValueError("File skenario kosong") from e
+        for i, chunk in enumerate(chunks):
+            # Potongan kosong hanya ditulis bila itu satu-satunya potongan (CSV berisi header saja)
+            if i > 0 and len(chunk) == 0:
+                continue
+            for hasil in iter_scores(model, chunk, chunk_size):
+                hasil.to_csv(out, header=(i == 0), index=False)
+                n_baris += len(hasil)
+    finally:
+        if out is not dst:
+            out.close()
+    detik = time.perf_counter() - mulai
+    return {'rows': n_baris, 'seconds': detik, 'rows_per_s': n_baris / detik if detik > 0 else float('inf')}
+
+
+# Grid skenario: semua kombinasi intensitas hujan (min..max, langkah step) x bulan
+def make_grid(intensitas_min, intensitas_max, step, bulan=range(1, 13)):
+    intensitas = np.arange(intensitas_min, intensitas_max + step / 2, step)
+    return pd.DataFrame({
+        'Intensitas_Hujan': np.repeat(intensitas, len(bulan)),
+        'Bulan_Angka': np.tile(np.asarray(bulan), len(intensitas)),
+    })
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+
+from padi.diskcache import dump_atomic, prune_lru, touch
+from padi.model import DEFAULT_PARAMS, FITUR, TARGET
+from padi.telemetry import TELEMETRY
+
+DEFAULT_GRID = {'n_estimators': [50, 100, 200], 'max_depth': [None, 5, 10]}
+
+
+# Pembagian data: 'kfold' (acak, k lipatan) atau 'tahun' (urut waktu: latih dengan
+# tahun-tahun sebelumnya, uji pada satu tahun berikutnya; k = jumlah tahun uji terakhir)
+def make_folds(data_merged, scheme='kfold', k=5):
+    if scheme == 'kfold':
+        return list(KFold(n_splits=k, shuffle=True, random_state=42).split(data_merged))
+    if scheme == 'tahun':
+        tahun = data_merged['Tahun'].astype(int).to_numpy()
+        urutan = np.unique(tahun)
+        if len(urutan) < 2:
+            raise ValueError("Validasi per tahun membutuhkan data minimal 2 tahun")
+        return [(np.flatnonzero(tahun < t), np.flatnonzero(tahun == t)) for t in urutan[1:][-k:]]
+    raise ValueError(f"Skema validasi tidak dikenal: {scheme}")
+
+
+def _fit_fold(X, y, params, train, test):
+    mulai = time.perf_counter()
+    model = RandomForestRegressor(**params)
+    model.fit(X[train], y[train])
+    y_pred = model.predict(X[test])
+    return {
+        'mse': mean_squared_error(y[test], y_pred),
+        'r2': r2_score(y[test], y_pred) if len(test) > 1 else float('nan'),
+        'seconds': time.perf_counter() - mulai,
+    }
+
+
+# Cache hasil lipatan per (hash dataset, skema, k, hyperparameter). Grid yang diperluas
+# hanya menghitung sel baru; dengan cache_dir hasil juga disimpan ke disk dengan joblib.
+# Seperti ModelRegistry, memori dibatasi max_entries (LRU) dan disk max_disk_entries.
+class CVCache:
+    def __init__(self, cache_dir=None, max_entries=256, max_disk_entries=1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(data_hash, scheme, k, params):
+        raw = json.dumps([data_hash, scheme, k, params], sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"cv_{key}.joblib")
+
+    def _put(self, key, folds):
+        self._entries[key] = folds
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if not self.cache_dir or not os.path.exists(self._path(key)):
+            return None
+        try:
+            folds = joblib.load(self._path(key))
+        except FileNotFoundError:
+            return None
+        touch(self._path(key))
+        with self._lock:
+            self._put(key, folds)
+        return folds
+
+    def put(self, key, folds):
+        with self._lock:
+            self._put(key, folds)
+        if self.cache_dir:
+            dump_atomic(folds, self._path(key))
+            prune_lru(self.cache_dir, self.max_disk_entries, prefix='cv_')
+
+
+# Cross-validation untuk setiap kombinasi hyperparameter. Semua pasangan (konfigurasi, lipatan)
+# yang belum ada di cache dijalankan paralel di n_jobs proses (-1 = semua core).
+def cross_validate_grid(data_merged, grid=None, scheme='kfold', k=5, n_jobs=-1, cache=None, data_hash=None):
+    X = data_merged[FITUR].to_numpy()
+    y = data_merged[TARGET].to_numpy()
+    folds = make_folds(data_merged, scheme, k)
+    configs = [dict(DEFAULT_PARAMS, n_jobs=1, **p) for p in ParameterGrid(grid or DEFAULT_GRID)]
+    keys = [CVCache.make_key(data_hash, scheme, k, c) for c in configs]
+
+    hasil = {}
+    if cache is not None and data_hash is not None:
+        hasil = {key: cache.get(key) for key in keys}
+        hasil = {key: folds_hasil for key, folds_hasil in hasil.items() if folds_hasil is not None}
+    baru = [i for i, key in enumerate(keys) if key not in hasil]
+    for i in range(len(keys)):
+        TELEMETRY.cache_event('cv', hit=i not in baru)
+
+    tugas = [(i, train, test) for i in baru for train, test in folds]
+    with TELEMETRY.span('cv', scheme=scheme):
+        keluaran = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_fold)(X, y, configs[i], train, test) for i, train, test in tugas
+        )
+    for i in baru:
+        hasil[keys[i]] = [r for (j, _, _), r in zip(tugas, keluaran) if j == i]
+        if cache is not None and data_hash is not None:
+            cache.put(keys[i], hasil[keys[i]])
+
+    baris = []
+    for i, (config, key) in enumerate(zip(configs, keys)):
+        lipatan = pd.DataFrame(hasil[key])
+        baris.append({
+            **{p: config[p] for p in (grid or DEFAULT_GRID)},
+            'mse_mean': lipatan['mse'].mean(),
+            'mse_std': lipatan['mse'].std(ddof=0),
+            'r2_mean': lipatan['r2'].mean(),
+            'r2_std': lipatan['r2'].std(ddof=0),
+            # Jumlah waktu fit semua lipatan (diukur di worker paralel), bukan waktu dinding konfigurasi
+            'fit_seconds': lipatan['seconds'].sum(),
+            'cached': i not in baru,
+        })
+    tabel = pd.DataFrame(baris)
+    for p in (grid or DEFAULT_GRID):
+        # Pertahankan None (mis. max_depth=None) alih-alih NaN
+        tabel[p] = pd.Series([config[p] for config in configs], dtype=object)
+    return tabel.sort_values('mse_mean').reset_index(drop=True)
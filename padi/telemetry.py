@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('padi.telemetry')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + '}'
+
+
+# Memori RSS proses saat ini (byte); di luar Linux memakai puncak RSS dari getrusage
+def current_rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Pencatat waktu (span), hitungan cache hit/miss dan puncak RSS proses.
+# Agregat dibagi ke seluruh proses; rekaman per rerun disimpan per thread sehingga
+# tiap sesi Streamlit (satu thread per rerun) hanya melihat span miliknya sendiri.
+class Telemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._counters = {}
+        self._peak_rss = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name, **labels):
+        mulai = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - mulai, **labels)
+
+    def record(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            count, total, maks = self._spans.get(key, (0, 0.0, 0.0))
+            self._spans[key] = (count + 1, total + seconds, max(maks, seconds))
+        rekaman = getattr(self._local, 'rekaman', None)
+        if rekaman is not None:
+            rekaman.append({'span': name, **labels, 'seconds': seconds})
+        logger.info(json.dumps({'event': 'span', 'span': name, **labels, 'seconds': round(seconds, 6)}, default=str))
+
+    def count(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+        logger.debug(json.dumps({'event': 'count', 'counter': name, **labels}, default=str))
+
+    def cache_event(self, cache, hit):
+        self.count('cache_events', cache=cache, result='hit' if hit else 'miss')
+
+    # Mulai merekam span untuk satu rerun di thread ini
+    def start_rerun(self):
+        self._local.rekaman = []
+
+    # Selesai rerun: kembalikan span rerun ini dan catat RSS proses. RSS dibagi semua
+    # sesi di proses yang sama, jadi yang dicatat adalah puncak per proses, bukan per sesi.
+    def finish_rerun(self):
+        rekaman = getattr(self._local, 'rekaman', None) or []
+        self._local.rekaman = None
+        rss = current_rss()
+        with self._lock:
+            self._peak_rss = max(self._peak_rss, rss)
+        return rekaman
+
+    def peak_rss(self):
+        with self._lock:
+            return self._peak_rss
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'spans': [{'span': n, **dict(l), 'count': c, 'seconds_total': t, 'seconds_max': m}
+                          for (n, l), (c, t, m) in self._spans.items()],
+                'counters': [{'counter': n, **dict(l), 'value': v} for (n, l), v in self._counters.items()],
+                'process_peak_rss_bytes': self._peak_rss,
+            }
+
+    # Format teks Prometheus (exposition format 0.0.4)
+    def prometheus_text(self):
+        with self._lock:
+            spans = dict(self._spans)
+            counters = dict(self._counters)
+            puncak = self._peak_rss
+        baris = ['# HELP padi_span_seconds Durasi tahap pipeline.', '# TYPE padi_span_seconds summary']
+        for (nama, labels), (count, total, _) in sorted(spans.items()):
+            label = _label_text(dict(labels, span=nama))
+            baris += [f'padi_span_seconds_sum{label} {total}', f'padi_span_seconds_count{label} {count}']
+        baris += ['# HELP padi_span_seconds_max Durasi terlama tahap pipeline.', '# TYPE padi_span_seconds_max gauge']
+        for (nama, labels), (_, _, maks) in sorted(spans.items()):
+            baris.append(f'padi_span_seconds_max{_label_text(dict(labels, span=nama))} {maks}')
+        for nama in sorted({n for n, _ in counters}):
+            baris += [f'# TYPE padi_{nama}_total counter']
+            for (n, labels), nilai in sorted(counters.items()):
+                if n == nama:
+                    baris.append(f'padi_{nama}_total{_label_text(dict(labels))} {nilai}')
+        baris += ['# HELP padi_process_rss_bytes RSS proses saat ini.', '# TYPE padi_process_rss_bytes gauge',
+                  f'padi_process_rss_bytes {current_rss()}',
+                  '# HELP padi_process_peak_rss_bytes RSS proses tertinggi yang teramati di akhir rerun.',
+                  '# TYPE padi_process_peak_rss_bytes gauge',
+                  f'padi_process_peak_rss_bytes {puncak}']
+        return '\n'.join(baris) + '\n'
+
+
+TELEMETRY = Telemetry()
+
+
+# Endpoint /metrics untuk scraper Prometheus lokal, berjalan di thread daemon
+def serve_metrics(port, host='127.0.0.1', telemetry=TELEMETRY):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = telemetry.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name='padi-metrics').start()
+    return server
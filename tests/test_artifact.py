@@ -0,0 +1,27 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from padi.artifact import CompactForest, pack_forest
+
+sklearn = pytest.importorskip('sklearn.ensemble')
+
+
+def test_compact_forest_sama_dengan_predict(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'Intensitas_Hujan': rng.uniform(0, 500, 500).astype('float32'),
+                      'Bulan_Angka': rng.integers(1, 13, 500).astype('int8')})
+    y = X['Intensitas_Hujan'] * 3 + rng.normal(size=500) * 100
+    model = sklearn.RandomForestRegressor(n_estimators=20, random_state=42).fit(X, y)
+
+    path = str(tmp_path / 'forest')
+    pack_forest(model).save(path)
+    # Menyimpan ulang ke path yang sama mengganti isi tanpa sisa direktori sementara
+    pack_forest(model).save(path)
+    assert sorted(os.listdir(tmp_path)) == ['forest']
+
+    compact = CompactForest.load(path)
+    assert isinstance(compact.arrays['threshold'], np.memmap)
+    np.testing.assert_array_equal(compact.predict(X), model.predict(X))
@@ -0,0 +1,13 @@
+from padi.bench import compare_reports
+
+
+def laporan(**detik):
+    return {'results': [{'stage': s, 'rows': 96, 'seconds': d, 'peak_mb': 1.0} for s, d in detik.items()]}
+
+
+# Tahap singkat yang naik relatif besar tetapi hanya beberapa milidetik bukan regresi
+def test_compare_reports_mengabaikan_fluktuasi_kecil():
+    baseline = laporan(ingest=0.004, fit=1.0)
+    assert compare_reports(baseline, laporan(ingest=0.007, fit=1.1)) == []
+    regresi = compare_reports(baseline, laporan(ingest=0.004, fit=1.5))
+    assert [(r['stage'], r['metric']) for r in regresi] == [('fit', 'seconds')]
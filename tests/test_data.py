@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from padi.data import MergedCache, preprocess_data, reshape_wide
+
+BULAN = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+         'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+
+
+def tabel_lebar(prefix, tahun, seed, wilayah=None):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({'Bulan': BULAN * (len(wilayah) if wilayah else 1)})
+    if wilayah:
+        frame.insert(0, 'Wilayah', np.repeat(wilayah, 12))
+    for t in tahun:
+        frame[f'{prefix}{t}'] = rng.uniform(0, 500, len(frame)).round(1)
+    return frame
+
+
+# Data gabungan hasil penambahan tahun baru harus sama dengan hasil penggabungan penuh,
+# termasuk bila kolom tahun tersusun menurun atau tahun baru disisipkan di tengah
+@pytest.mark.parametrize('lama, baru', [
+    ([2021, 2020], [2022, 2021, 2020]),
+    ([2019, 2021], [2019, 2020, 2021]),
+    ([2019, 2020], [2019, 2020, 2021]),
+])
+@pytest.mark.parametrize('wilayah', [None, ['Bantul', 'Sleman']])
+def test_merged_cache_inkremental_sama_dengan_penuh(lama, baru, wilayah):
+    hujan = tabel_lebar('Intensitas_', baru, 0, wilayah)
+    padi = tabel_lebar('Jumlah_Produksi_Beras_', baru, 1, wilayah)
+    kolom = lambda frame, prefix: [c for c in frame.columns if not c.startswith(prefix) or int(c[len(prefix):]) in lama]
+
+    cache = MergedCache()
+    cache.get(hujan[kolom(hujan, 'Intensitas_')], padi[kolom(padi, 'Jumlah_Produksi_Beras_')])
+    inkremental = cache.get(hujan, padi)
+    penuh = reshape_wide(hujan, padi, typed=True)
+    pd.testing.assert_frame_equal(inkremental, penuh)
+
+
+# reshape_wide (tanpa typed) harus identik dengan preprocess_data (melt + merge), termasuk
+# urutan baris, tipe kolom dan baris yang dibuang atau tidak dikenali
+@pytest.mark.parametrize('ubah', [
+    # urutan bulan berbeda antar tabel
+    lambda hujan, padi: (hujan, padi.iloc[::-1].reset_index(drop=True)),
+    # satu bulan tidak ada di data padi
+    lambda hujan, padi: (hujan, padi[padi['Bulan'] != 'Juli'].reset_index(drop=True)),
+    # kolom tahun berisi bilangan bulat
+    lambda hujan, padi: (hujan.round().astype({c: 'int64' for c in hujan.columns[1:]}),
+                         padi.round().astype({c: 'int64' for c in padi.columns[1:]})),
+    # urutan kolom tahun berbeda dan ada tahun yang hanya di salah satu tabel
+    lambda hujan, padi: (hujan, padi[['Bulan', 'Jumlah_Produksi_Beras_2022', 'Jumlah_Produksi_Beras_2020']]),
+    # nama bulan yang tidak dikenal
+    lambda hujan, padi: (hujan.replace({'Bulan': {'Maret': 'Mar', 'Mei': 'Mei '}}),
+                         padi.replace({'Bulan': {'Maret': 'Mar', 'Mei': 'Mei '}})),
+])
+def test_reshape_wide_sama_dengan_preprocess_data(ubah):
+    hujan, padi = ubah(tabel_lebar('Intensitas_', [2020, 2021, 2022], 0),
+                       tabel_lebar('Jumlah_Produksi_Beras_', [2020, 2021, 2022], 1))
+    pd.testing.assert_frame_equal(reshape_wide(hujan, padi), preprocess_data(hujan, padi))
+
+
+@pytest.mark.parametrize('ubah', [
+    lambda hujan, padi: (hujan, padi.drop(columns='Wilayah')),
+    lambda hujan, padi: (pd.concat([hujan, hujan.iloc[:1]], ignore_index=True), padi),
+    lambda hujan, padi: (hujan, pd.concat([padi, padi.iloc[:1]], ignore_index=True)),
+])
+def test_reshape_wide_menolak_kunci_tidak_cocok(ubah):
+    wilayah = ['Bantul', 'Sleman']
+    hujan, padi = ubah(tabel_lebar('Intensitas_', [2020], 0, wilayah),
+                       tabel_lebar('Jumlah_Produksi_Beras_', [2020], 1, wilayah))
+    with pytest.raises(ValueError):
+        reshape_wide(hujan, padi, typed=True)
+
+
+def test_ingest_cache_dibatasi(tmp_path):
+    import io
+    import os
+
+    pytest.importorskip('pyarrow')
+    from padi.ingest import ingest_hujan
+
+    for i in range(4):
+        csv = tabel_lebar('Intensitas_', [2020], i).to_csv(index=False).encode()
+        ingest_hujan(io.BytesIO(csv), str(tmp_path), max_disk_entries=2)
+    assert len(os.listdir(tmp_path)) == 2
+
+
+# Sidik jari yang dihitung sekali per upload dipakai ulang tanpa hashing data lagi
+def test_merged_cache_memakai_sidik_jari_pemanggil(monkeypatch):
+    from padi import data as modul_data
+
+    hujan = tabel_lebar('Intensitas_', [2020, 2021], 0)
+    padi = tabel_lebar('Jumlah_Produksi_Beras_', [2020, 2021], 1)
+    cache = MergedCache()
+    sidik = MergedCache.fingerprint(hujan, padi)
+    pertama = cache.get(hujan, padi, sidik)
+
+    def gagal(frame):
+        raise AssertionError("data di-hash ulang")
+
+    monkeypatch.setattr(modul_data, 'column_fingerprints', gagal)
+    assert cache.get(hujan, padi, sidik) is pertama
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from padi.forecast import LagFeatures, _lag_features
+
+
+def referensi(hujan):
+    s = pd.Series(hujan)
+    return np.column_stack([s, s.shift(1), s.shift(2), s.shift(3), s.shift(4),
+                            s.rolling(3).sum(), s.rolling(6).sum(), np.arange(len(s)) % 12 + 1])
+
+
+def test_lag_features_sama_dengan_pandas():
+    hujan = np.random.default_rng(0).uniform(0, 500, (2, 30)).astype('float32')
+    hujan[1, 7] = np.nan
+    fitur = _lag_features(hujan, 0, 1)
+    for r in range(2):
+        np.testing.assert_allclose(fitur[r], referensi(hujan[r]), rtol=1e-5)
+
+
+# Perpanjangan bertahap (termasuk deret yang lebih pendek dari lag terpanjang)
+# harus sama dengan perhitungan sekaligus
+def test_lag_features_bertahap_sama_dengan_penuh():
+    hujan = np.random.default_rng(1).uniform(0, 500, (3, 20)).astype('float32')
+    fitur = LagFeatures(3)
+    for awal, akhir in [(0, 1), (1, 3), (3, 4), (4, 11), (11, 20)]:
+        fitur.extend(hujan[:, awal:akhir])
+    np.testing.assert_allclose(fitur.matrix, _lag_features(hujan, 0, 1))
+
+
+def test_lag_features_deret_pendek():
+    fitur = LagFeatures(1).extend(np.ones((1, 3)))
+    assert fitur.matrix.shape == (1, 3, 8)
+    assert np.isnan(fitur.matrix[0, :, 4]).all()
+
+
+def dataset_tahun(tahun):
+    from padi.data import reshape_wide
+    from padi.dataset import RegionDataset
+
+    bulan = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+             'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+    rng = np.random.default_rng(0)
+    hujan = pd.DataFrame({'Bulan': bulan, **{f'Intensitas_{t}': rng.uniform(0, 500, 12) for t in tahun}})
+    padi = pd.DataFrame({'Bulan': bulan, **{f'Jumlah_Produksi_Beras_{t}': rng.uniform(0, 9e4, 12) for t in tahun}})
+    return RegionDataset.from_merged(reshape_wide(hujan, padi, typed=True))
+
+
+# Dataset yang lebih panjang (perpanjangan deret yang sama) tidak boleh mengubah
+# matriks yang sudah diambil untuk dataset yang lebih pendek, dan sebaliknya
+def test_feature_store_dataset_bergantian():
+    from padi.forecast import FeatureStore
+
+    store = FeatureStore()
+    pendek, panjang = dataset_tahun([2020, 2021]), dataset_tahun([2020, 2021, 2022])
+    _, X_pendek, padi_pendek = store.get(pendek)
+    _, X_panjang, padi_panjang = store.get(panjang)
+    _, X_pendek_lagi, _ = store.get(pendek)
+
+    assert X_pendek.shape[:2] == padi_pendek.shape == (1, 24)
+    assert X_panjang.shape[:2] == padi_panjang.shape == (1, 36)
+    np.testing.assert_array_equal(X_pendek_lagi, X_pendek)
+    np.testing.assert_array_equal(X_panjang[:, :24], X_pendek)
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from padi.jobs import TrainingQueue
+
+
+class RegistryGagal:
+    def __init__(self):
+        self.calls = 0
+
+    def key_for(self, curah_hujan, produksi_padi, params=None, mode='evaluasi', data_hash=None):
+        return (mode, repr(params))
+
+    def get(self, key):
+        return None
+
+    def get_or_train(self, curah_hujan, produksi_padi, params=None, mode='evaluasi', data_hash=None):
+        self.calls += 1
+        raise ValueError("kolom kunci tidak cocok")
+
+
+# Trainer yang langsung gagal tidak boleh membuat submit berikutnya macet
+def test_submit_tidak_macet_bila_trainer_langsung_gagal():
+    registry = RegistryGagal()
+    queue = TrainingQueue(registry)
+    hasil = []
+
+    def kirim():
+        for _ in range(3):
+            job = queue.submit(None, None, mode='penuh')
+            with pytest.raises(ValueError):
+                job.result(timeout=5)
+            hasil.append(job.status)
+
+    thread = threading.Thread(target=kirim, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert hasil == ['gagal'] * 3
+    assert registry.calls == 3
+    assert queue.pending() == []
+    queue.shutdown()
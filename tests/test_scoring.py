@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from padi.scoring import KOLOM_PREDIKSI, score_frame
+
+
+class ModelKonstan:
+    def __init__(self, nilai):
+        self.nilai = nilai
+
+    def predict(self, X):
+        return np.full(len(X), self.nilai, dtype=float)
+
+
+@pytest.mark.parametrize('kosong', [None, np.nan])
+def test_wilayah_kosong_ditolak(kosong):
+    models = {'Bantul': ModelKonstan(1.0), 'Sleman': ModelKonstan(2.0)}
+    skenario = pd.DataFrame({'Intensitas_Hujan': [10.0, 20.0], 'Bulan_Angka': [1, 2],
+                             'Wilayah': ['Bantul', kosong]})
+    with pytest.raises(ValueError, match='Wilayah'):
+        score_frame(models, skenario)
+
+
+def test_prediksi_per_wilayah():
+    models = {'Bantul': ModelKonstan(1.0), 'Sleman': ModelKonstan(2.0)}
+    skenario = pd.DataFrame({'Intensitas_Hujan': [10.0, 20.0, 30.0], 'Bulan_Angka': [1, 2, 3],
+                             'Wilayah': ['Sleman', 'Bantul', 'Sleman']})
+    assert score_frame(models, skenario)[KOLOM_PREDIKSI].tolist() == [2.0, 1.0, 2.0]
+
+
+def test_prepare_features_nama_atau_angka_bulan():
+    from padi.scoring import prepare_features
+
+    dari_nama = prepare_features(pd.DataFrame({'Intensitas_Hujan': [1, 2], 'Bulan': ['Januari', 'Desember']}))
+    dari_angka = prepare_features(pd.DataFrame({'Intensitas_Hujan': [1, 2], 'Bulan_Angka': ['1', 12]}))
+    assert list(dari_nama.columns) == ['Intensitas_Hujan', 'Bulan_Angka']
+    pd.testing.assert_frame_equal(dari_nama, dari_angka, check_dtype=False)
+
+
+@pytest.mark.parametrize('skenario', [
+    pd.DataFrame({'Bulan_Angka': [1]}),
+    pd.DataFrame({'Intensitas_Hujan': [1.0]}),
+    pd.DataFrame({'Intensitas_Hujan': ['banyak'], 'Bulan_Angka': [1]}),
+    pd.DataFrame({'Intensitas_Hujan': [1.0], 'Bulan_Angka': [13]}),
+    pd.DataFrame({'Intensitas_Hujan': [1.0], 'Bulan_Angka': [1.5]}),
+    pd.DataFrame({'Intensitas_Hujan': [1.0], 'Bulan': ['Jan']}),
+])
+def test_prepare_features_menolak_skenario_tidak_valid(skenario):
+    from padi.scoring import prepare_features
+
+    with pytest.raises(ValueError):
+        prepare_features(skenario)
+
+
+def test_make_grid():
+    from padi.scoring import make_grid
+
+    grid = make_grid(0, 20, 10)
+    assert len(grid) == 3 * 12
+    assert grid['Intensitas_Hujan'].unique().tolist() == [0, 10, 20]
+    assert grid['Bulan_Angka'].iloc[:12].tolist() == list(range(1, 13))
+    assert make_grid(5, 5, 1, [3]).to_dict('list') == {'Intensitas_Hujan': [5.0], 'Bulan_Angka': [3]}
+
+
+def test_score_csv_per_potongan(tmp_path):
+    from padi.scoring import score_csv
+
+    src = tmp_path / 'skenario.csv'
+    pd.DataFrame({'Intensitas_Hujan': range(25), 'Bulan_Angka': [1, 2, 3, 4, 5] * 5, 'Id': range(25)}).to_csv(src, index=False)
+    dst = tmp_path / 'hasil.csv'
+    statistik = score_csv(ModelKonstan(7.0), str(src), str(dst), chunk_size=10)
+    hasil = pd.read_csv(dst)
+    assert statistik['rows'] == 25
+    assert hasil['Id'].tolist() == list(range(25))
+    assert (hasil[KOLOM_PREDIKSI] == 7.0).all()
+
+
+def test_score_csv_header_saja(tmp_path):
+    import io
+
+    from padi.scoring import score_csv
+
+    hasil = io.StringIO()
+    statistik = score_csv(ModelKonstan(7.0), io.StringIO('Intensitas_Hujan,Bulan_Angka\n'), hasil)
+    assert statistik['rows'] == 0
+    assert hasil.getvalue().strip() == f'Intensitas_Hujan,Bulan_Angka,{KOLOM_PREDIKSI}'
+    with pytest.raises(ValueError):
+        score_csv(ModelKonstan(7.0), io.StringIO(''), io.StringIO())
@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+pytest.importorskip('sklearn')
+
+from padi.selection import CVCache  # noqa: E402
+
+
+def test_cv_cache_dibatasi(tmp_path):
+    cache = CVCache(str(tmp_path), max_entries=2, max_disk_entries=3)
+    for i in range(5):
+        cache.put(f'k{i}', [{'mse': float(i)}])
+    assert len(cache._entries) == 2
+    assert len(os.listdir(tmp_path)) == 3
+    assert not [n for n in os.listdir(tmp_path) if n.endswith('.tmp')]
+    # Entri yang sudah keluar dari memori dimuat ulang dari disk
+    assert cache.get('k2') == [{'mse': 2.0}]
+    assert cache.get('k0') is None